@@ -5,76 +5,159 @@ Generates performance comparison plots from benchmark results.
 """
 
 import os
+import re
 import sys
 import json
+import warnings
 import csv
 import argparse
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import numpy as np
 from pathlib import Path
 
-def parse_startup_file(filepath):
-    """Parse startup time file and extract startup time in seconds"""
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    # json.loads accepts bytes as well, so callers can always pass raw file contents
+    _json_loads = json.loads
+
+# Matches "<label>...: <seconds>s" lines in the per-metric text files, e.g.
+# "Startup time: 12.975s" or "Average Latency for Query 1: 0.000523s"
+_METRIC_RE = re.compile(
+    r'^[ \t]*(Startup time|Data loading time|Index creation time|Average time|Average Latency|Wall time)'
+    r'[^:\n]*:[ \t]*([0-9.eE+-]+)s?[ \t]*$',
+    re.MULTILINE,
+)
+_METRIC_KEYS = {
+    'Startup time': 'startup',
+    'Data loading time': 'data_loading',
+    'Index creation time': 'index_creation',
+    'Average time': 'average',
+    'Average Latency': 'average',
+    'Wall time': 'total',
+}
+
+def parse_metric_file(filepath, keys=None):
+    """Parse a metric text file and return a dict of the requested metrics in seconds"""
+    metrics = {}
     try:
         with open(filepath, 'r') as f:
             content = f.read()
-            for line in content.split('\n'):
-                line = line.strip()
-                if line.startswith('Startup time'):
-                    time_str = line.split(':')[1].strip()
-                    return float(time_str.rstrip('s'))
+        for match in _METRIC_RE.finditer(content):
+            key = _METRIC_KEYS[match.group(1)]
+            if (keys is None or key in keys) and key not in metrics:
+                metrics[key] = float(match.group(2))
     except (FileNotFoundError, ValueError):
-        pass
-    return None
-
-def parse_data_loading_file(filepath):
-    """Parse data loading time file and extract data loading time in seconds"""
+        return {}
+    return metrics
+
+# Unit suffix -> scale factor for the resource CSV columns.
+# CPU is reported in cores: kubectl top uses millicores ("100m"), docker stats
+# percent of one core ("0.50%"). Memory is reported in MiB: kubectl top uses
+# Ki/Mi/Gi, docker stats KiB/MiB/GiB; bare numbers are kept as-is.
+_CPU_UNITS = {'': 1.0, 'm': 1.0 / 1000, '%': 1.0 / 100}
+_MEMORY_UNITS = {
+    '': 1.0,
+    'Ki': 1.0 / 1024, 'KiB': 1.0 / 1024,
+    'Mi': 1.0, 'MiB': 1.0,
+    'Gi': 1024.0, 'GiB': 1024.0,
+}
+
+def _to_float(values):
+    """Convert a string array to float64, mapping unparseable entries to NaN"""
     try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-            for line in content.split('\n'):
-                line = line.strip()
-                if 'Data loading' in line and 'time' in line:
-                    time_str = line.split(':')[1].strip()
-                    return float(time_str.rstrip('s'))
-    except (FileNotFoundError, ValueError):
-        pass
-    return None
+        return values.astype(np.float64)
+    except ValueError:
+        out = np.full(values.shape, np.nan)
+        for i, value in enumerate(values):
+            try:
+                out[i] = float(value)
+            except ValueError:
+                pass
+        return out
+
+def _parse_units(values, units):
+    """Parse "<number><unit>" strings scaled by a unit lookup table, NaN for unknown units"""
+    suffixes = np.char.lstrip(values, '0123456789.+-eE')
+    scale = np.select([suffixes == unit for unit in units], list(units.values()), default=np.nan)
+    numbers = _to_float(np.char.rstrip(values, ''.join(set(''.join(units)))))
+    return numbers * scale
+
+def _read_csv_columns(filepath):
+    """Read a CSV into a header list and a 2-D string array, skipping malformed rows"""
+    with open(filepath, 'r', newline='') as f:
+        header = next(csv.reader(f), [])
+        if not header:
+            return header, np.empty((0, 0), dtype=str)
+        try:
+            # numpy's C tokenizer; header-only files warn and yield an empty table
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                table = np.loadtxt(f, dtype=str, delimiter=',', ndmin=2, comments=None)
+            if table.size == 0 or table.shape[1] == len(header):
+                return header, table.reshape(-1, len(header))
+        except ValueError:
+            pass
+
+        # Ragged rows (e.g. a line cut short when the monitor was killed): filter row by row
+        f.seek(0)
+        reader = csv.reader(f)
+        next(reader)
+        rows = [row for row in reader if len(row) == len(header)]
+    return header, np.array(rows, dtype=str).reshape(-1, len(header))
+
+def parse_resource_file(filepath):
+    """Parse resource usage CSV into timestamp, CPU (cores) and memory (MiB) arrays"""
+    header, table = _read_csv_columns(filepath)
+    if not len(table):
+        return np.empty(0), np.empty(0), np.empty(0)
+
+    ts_str = np.char.strip(table[:, header.index('Timestamp')])
+    cpu_str = np.char.strip(table[:, header.index('CPU')])
+    mem_str = np.char.strip(table[:, header.index('Memory')])
+
+    timestamps = _to_float(ts_str)
+
+    cpu = _parse_units(cpu_str, _CPU_UNITS)
+    memory = _parse_units(mem_str, _MEMORY_UNITS)
+
+    # Drop rows that failed to parse
+    valid = ~(np.isnan(timestamps) | np.isnan(cpu) | np.isnan(memory))
+    return timestamps[valid], cpu[valid], memory[valid]
+
+def _new_figure(figsize):
+    """Create an Agg-backed figure without going through the pyplot state machine"""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+def _plot_grouped_bars(ax, names, series, present, labels, colors, ylabel, title):
+    """Draw per-query bars from a (database, query) matrix and its presence mask; returns False if empty"""
+    if not present.any():
+        return False
+
+    x = np.arange(len(labels))
+    width = 0.35
 
-def parse_index_creation_file(filepath):
-    """Parse index creation time file and extract index creation time in seconds"""
-    try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-            for line in content.split('\n'):
-                line = line.strip()
-                if 'Index creation' in line and 'time' in line:
-                    time_str = line.split(':')[1].strip()
-                    return float(time_str.rstrip('s'))
-    except (FileNotFoundError, ValueError):
-        pass
-    return None
+    for i, (name, values) in enumerate(zip(names, series)):
+        if present[i].any():
+            ax.bar(x + i*width, values, width, label=name, color=colors[i], alpha=0.7)
 
-def parse_time_file(filepath):
-    """Parse query time file and extract average and total times in seconds"""
-    try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-            times = {}
-            for line in content.split('\n'):
-                line = line.strip()
-                if line.startswith('Average time') or line.startswith('Average Latency'):
-                    time_str = line.split(':')[1].strip()
-                    times['average'] = float(time_str.rstrip('s'))
-                elif line.startswith('Wall time'):
-                    time_str = line.split(':')[1].strip()
-                    times['total'] = float(time_str.rstrip('s'))
-            return times if times else None
-    except (FileNotFoundError, ValueError):
-        pass
-    return None
+    ax.set_xlabel('Query Type')
+    ax.set_ylabel(ylabel)
+    ax.set_title(title, fontweight='normal')
+    ax.set_xticks(x + width/2)
+    ax.set_xticklabels(labels, rotation=0)
+    ax.legend()
+    ax.grid(True, alpha=0.3, axis='y')
+    ax.set_ylim(bottom=0)
 
-def generate_plots(databases, results_dir='results', plots_dir='plots', scale='', concurrency='', transactions=''):
+    return True
+
+def generate_plots(databases, results_dir='results', plots_dir='plots', scale='', concurrency='', transactions='', dpi=150):
     """Generate performance comparison plots"""
 
     # Ensure plots directory exists
@@ -86,6 +169,10 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
     # Colors for different databases
     colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
 
+    # Display names for labels, legends and the summary file
+    titles = {db: db.title() for db in databases}
+    db_titles = [titles[db] for db in databases]
+
     # Collect all times for totals
     total_times = {db: 0.0 for db in databases}
     total_query_times = {db: 0.0 for db in databases}
@@ -93,120 +180,108 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
     data_loading_times = {db: None for db in databases}
     index_creation_times = {db: None for db in databases}
     index_sizes = {db: None for db in databases}
-    resource_usage = {db: {'cpu': [], 'memory': [], 'timestamps': []} for db in databases}
-    query_times = {query: {db: None for db in databases} for query in queries}
-    query_tps = {query: {db: None for db in databases} for query in queries}
-
-    # Collect startup times
-    for db in databases:
-        startup_file = os.path.join(results_dir, f'{scale}_{concurrency}_{transactions}_{db}_startup_time.txt')
-        if not os.path.exists(startup_file):
-             startup_file = os.path.join(results_dir, f'{scale}_{db}_startup_time.txt')
-        startup_times[db] = parse_startup_file(startup_file)
-
-    # Collect metrics from JSON or fallback to text files
-    for db in databases:
-        json_file = os.path.join(results_dir, f'{scale}_{concurrency}_{transactions}_{db}_results.json')
-        if not os.path.exists(json_file):
-             json_file = os.path.join(results_dir, f'{scale}_{db}_results.json')
-             
-        if os.path.exists(json_file):
+    resource_usage = {
+        db: {'cpu': np.empty(0, np.float32), 'memory': np.empty(0, np.float32), 'timestamps': np.empty(0)}
+        for db in databases
+    }
+    # Per-query metrics as (database, query) matrices; NaN marks missing data
+    query_times = np.full((len(databases), len(queries)), np.nan)
+    query_tps = np.full((len(databases), len(queries)), np.nan)
+
+    # List the results directory once instead of probing each candidate file
+    try:
+        result_files = set(os.listdir(results_dir))
+    except FileNotFoundError:
+        result_files = set()
+
+    # Filename prefixes are constant across databases, so build them once
+    prefix_full = f'{scale}_{concurrency}_{transactions}_'
+    prefix_short = f'{scale}_'
+
+    def result_path(*candidates):
+        """Return the path of the first candidate present in results_dir, or None"""
+        return next((f'{results_dir}/{name}' for name in candidates if name in result_files), None)
+
+    def ingest(d, db):
+        """Collect all metrics for one database; only touches that database's entries"""
+        # Collect startup time
+        startup_file = result_path(prefix_full + f'{db}_startup_time.txt',
+                                   prefix_short + f'{db}_startup_time.txt')
+        if startup_file:
+            startup_times[db] = parse_metric_file(startup_file).get('startup')
+
+        # Collect metrics from JSON or fallback to text files
+        json_file = result_path(prefix_full + f'{db}_results.json',
+                                prefix_short + f'{db}_results.json')
+        if json_file:
             try:
-                with open(json_file, 'r') as f:
-                    data = json.load(f)
-                    metrics = data.get('metrics', {})
-                    
-                    data_loading_times[db] = metrics.get('data_loading_time')
-                    index_creation_times[db] = metrics.get('index_creation_time')
-                    index_sizes[db] = metrics.get('database_size_bytes')
-                    
-                    for i, query in enumerate(queries):
-                        q_key = f'query_{i+1}'
-                        if q_key in metrics:
-                            query_times[query][db] = metrics[q_key].get('average_latency')
-                            query_tps[query][db] = metrics[q_key].get('tps')
-                            if metrics[q_key].get('total_time'):
-                                total_times[db] += metrics[q_key].get('total_time')
-                                total_query_times[db] += metrics[q_key].get('total_time')
+                data = _json_loads(Path(json_file).read_bytes())
+                metrics = data.get('metrics', {})
+
+                data_loading_times[db] = metrics.get('data_loading_time')
+                index_creation_times[db] = metrics.get('index_creation_time')
+                index_sizes[db] = metrics.get('database_size_bytes')
+
+                for i in range(len(queries)):
+                    query_metrics = metrics.get(f'query_{i+1}')
+                    if query_metrics is None:
+                        continue
+                    # None is stored as NaN
+                    query_times[d, i] = query_metrics.get('average_latency')
+                    query_tps[d, i] = query_metrics.get('tps')
+                    total_time = query_metrics.get('total_time') or 0.0
+                    total_times[db] += total_time
+                    total_query_times[db] += total_time
             except Exception as e:
                 print(f"Error parsing JSON for {db}: {e}")
         
         # Collect resource usage
-        resource_file = os.path.join(results_dir, f'{scale}_{concurrency}_{transactions}_{db}_resources.csv')
-        if not os.path.exists(resource_file):
-             resource_file = os.path.join(results_dir, f'{scale}_{db}_resources.csv')
-             
-        if os.path.exists(resource_file):
+        resource_file = result_path(prefix_full + f'{db}_resources.csv',
+                                    prefix_short + f'{db}_resources.csv')
+        if resource_file:
             try:
-                with open(resource_file, 'r') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        try:
-                            ts = float(row['Timestamp'])
-                            # Parse CPU (e.g., "100m" -> 0.1, "2" -> 2.0, "0.50%" -> 0.005)
-                            cpu_str = row['CPU']
-                            if cpu_str.endswith('m'):
-                                cpu = float(cpu_str[:-1]) / 1000.0
-                            elif cpu_str.endswith('%'):
-                                # Docker stats format: 100% = 1 core
-                                cpu = float(cpu_str[:-1]) / 100.0
-                            else:
-                                cpu = float(cpu_str)
-                            
-                            # Parse Memory (e.g., "500Mi" -> 500, "1Gi" -> 1024, "10MiB" -> 10)
-                            mem_str = row['Memory']
-                            if mem_str.endswith('Gi'):
-                                mem = float(mem_str[:-2]) * 1024
-                            elif mem_str.endswith('GiB'):
-                                mem = float(mem_str[:-3]) * 1024
-                            elif mem_str.endswith('Mi'):
-                                mem = float(mem_str[:-2])
-                            elif mem_str.endswith('MiB'):
-                                mem = float(mem_str[:-3])
-                            elif mem_str.endswith('Ki'):
-                                mem = float(mem_str[:-2]) / 1024
-                            elif mem_str.endswith('KiB'):
-                                mem = float(mem_str[:-3]) / 1024
-                            else:
-                                mem = float(mem_str) # Assume bytes or raw number, treat as MiB? Or just raw.
-                                # Actually kubectl top usually returns Mi or Gi.
-                                # If it's just a number, it might be bytes, but let's assume MiB if unsure or handle carefully.
-                                # For now, let's assume standard kubectl output.
-                            
-                            resource_usage[db]['timestamps'].append(ts)
-                            resource_usage[db]['cpu'].append(cpu)
-                            resource_usage[db]['memory'].append(mem)
-                        except ValueError:
-                            continue
-                    
-                    # Normalize timestamps to start from 0
-                    if resource_usage[db]['timestamps']:
-                        start_ts = resource_usage[db]['timestamps'][0]
-                        resource_usage[db]['timestamps'] = [t - start_ts for t in resource_usage[db]['timestamps']]
+                timestamps, cpu, memory = parse_resource_file(resource_file)
+                # float32 is plenty for plotting and halves what Agg has to walk;
+                # timestamps stay float64 since epoch seconds need the precision
+                resource_usage[db]['cpu'] = cpu.astype(np.float32)
+                resource_usage[db]['memory'] = memory.astype(np.float32)
+
+                # Normalize timestamps to start from 0
+                if len(timestamps):
+                    timestamps -= timestamps[0]
+                    resource_usage[db]['timestamps'] = timestamps
             except Exception as e:
                 print(f"Error parsing resources for {db}: {e}")
 
         # Fallback if data missing
-        if data_loading_times[db] is None:
-            data_loading_file = os.path.join(results_dir, f'{scale}_{db}_data_loading_time.txt')
-            data_loading_times[db] = parse_data_loading_file(data_loading_file)
-            
-        if index_creation_times[db] is None:
-            index_creation_file = os.path.join(results_dir, f'{scale}_{db}_index_creation_time.txt')
-            index_creation_times[db] = parse_index_creation_file(index_creation_file)
-            
+        data_loading_file = result_path(prefix_short + f'{db}_data_loading_time.txt')
+        if data_loading_times[db] is None and data_loading_file:
+            data_loading_times[db] = parse_metric_file(data_loading_file).get('data_loading')
+
+        index_creation_file = result_path(prefix_short + f'{db}_index_creation_time.txt')
+        if index_creation_times[db] is None and index_creation_file:
+            index_creation_times[db] = parse_metric_file(index_creation_file).get('index_creation')
+
         for i, query in enumerate(queries):
-            if query_times[query][db] is None:
-                time_file = os.path.join(results_dir, f'{scale}_{db}_{query}_time.txt')
-                times = parse_time_file(time_file)
-                if times:
-                    query_times[query][db] = times['average']
-                    if times['total'] is not None:
+            time_file = result_path(prefix_short + f'{db}_{query}_time.txt')
+            if np.isnan(query_times[d, i]) and time_file:
+                times = parse_metric_file(time_file, ('average', 'total'))
+                if 'average' in times:
+                    query_times[d, i] = times['average']
+                    if times.get('total') is not None:
                         total_query_times[db] += times['total']
                         total_times[db] += times['total']
                     # Estimate TPS if not available
                     if times['average'] > 0:
-                        query_tps[query][db] = 1.0 / times['average']
+                        query_tps[d, i] = 1.0 / times['average']
+
+    # Each database's result files are independent, so read them concurrently
+    with ThreadPoolExecutor(max_workers=len(databases)) as executor:
+        list(executor.map(ingest, range(len(databases)), databases))
+
+    # Presence masks are computed once and shared by the plots and the summary
+    times_present = np.isfinite(query_times)
+    tps_present = np.isfinite(query_tps)
 
     # Calculate total times (excluding queries as they are already added if available)
     for db in databases:
@@ -217,99 +292,11 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
         if index_creation_times[db] is not None:
             total_times[db] += index_creation_times[db]
 
-    # Generate aggregated plot (all queries in one chart) - Time
-    fig2, ax2 = plt.subplots(figsize=(10, 6))
-    fig2.suptitle('Aggregated Performance by Query Type - Time', fontsize=16, fontweight='normal')
-
-    x = np.arange(len(queries))
-    width = 0.35
-
-    db_data = []
-    for db in databases:
-        times = [query_times[q][db] for q in queries]
-        db_data.append(times)
-
-    if any(any(t is not None for t in times) for times in db_data):
-        for i, db in enumerate(databases):
-            times = [query_times[q][db] for q in queries]
-            valid_times = [t for t in times if t is not None]
-            if valid_times:
-                ax2.bar(x + i*width, times, width, label=db.title(), color=colors[i], alpha=0.7)
-
-        ax2.set_xlabel('Query Type')
-        ax2.set_ylabel('Time (seconds)')
-        ax2.set_title('Query Performance Comparison')
-        ax2.set_xticks(x + width/2)
-        ax2.set_xticklabels(query_labels)
-        ax2.legend()
-        ax2.grid(True, alpha=0.3, axis='y')
-        ax2.set_ylim(bottom=0)
-
-        # Add value labels
-        for i, db in enumerate(databases):
-            for j, time_val in enumerate([query_times[q][db] for q in queries]):
-                if time_val is not None:
-                    ax2.text(x[j] + i*width, time_val + max([t for sublist in db_data for t in sublist if t is not None])*0.02,
-                            f'{time_val:.4f}', ha='center', va='bottom', fontweight='normal')
-
-    else:
-        ax2.text(0.5, 0.5, 'No data available',
-                transform=ax2.transAxes, ha='center', va='center',
-                fontsize=12, color='gray')
-
-    plt.tight_layout()
-    # agg_plot_file = os.path.join(plots_dir, f'{scale}_{concurrency}_{transactions}_aggregated_performance_time.png')
-    # plt.savefig(agg_plot_file, dpi=300, bbox_inches='tight')
-    plt.close()
-
-    # print(f"Aggregated time performance plot saved to: {agg_plot_file}")
-
-    # Generate aggregated plot (all queries in one chart) - TPS
-    fig3, ax3 = plt.subplots(figsize=(10, 6))
-    fig3.suptitle('Aggregated Performance by Query Type - TPS', fontsize=16, fontweight='normal')
-
-    db_tps_data = []
-    for db in databases:
-        tps_values = [query_tps[q][db] for q in queries]
-        db_tps_data.append(tps_values)
-
-    if any(any(t is not None for t in tps_values) for tps_values in db_tps_data):
-        for i, db in enumerate(databases):
-            tps_values = [query_tps[q][db] for q in queries]
-            valid_tps = [t for t in tps_values if t is not None]
-            if valid_tps:
-                ax3.bar(x + i*width, tps_values, width, label=db.title(), color=colors[i], alpha=0.7)
-
-        ax3.set_xlabel('Query Type')
-        ax3.set_ylabel('Transactions Per Second')
-        ax3.set_title('Query TPS Comparison')
-        ax3.set_xticks(x + width/2)
-        ax3.set_xticklabels(query_labels)
-        ax3.legend()
-        ax3.grid(True, alpha=0.3, axis='y')
-        ax3.set_ylim(bottom=0)
-
-        # Add value labels
-        for i, db in enumerate(databases):
-            for j, tps_val in enumerate([query_tps[q][db] for q in queries]):
-                if tps_val is not None:
-                    ax3.text(x[j] + i*width, tps_val + max([t for sublist in db_tps_data for t in sublist if t is not None])*0.02,
-                            f'{tps_val:.2f}', ha='center', va='bottom', fontweight='normal')
-
-    else:
-        ax3.text(0.5, 0.5, 'No data available',
-                transform=ax3.transAxes, ha='center', va='center',
-                fontsize=12, color='gray')
-
-    plt.tight_layout()
-    # agg_tps_plot_file = os.path.join(plots_dir, f'{scale}_{concurrency}_{transactions}_aggregated_performance_tps.png')
-    # plt.savefig(agg_tps_plot_file, dpi=300, bbox_inches='tight')
-    plt.close()
-
-    # print(f"Aggregated TPS performance plot saved to: {agg_tps_plot_file}")
+    # Only the combined summary figure is written to disk, so no standalone figures are built.
 
     # Generate Database Size Plot
-    # fig4, ax4 = plt.subplots(figsize=(10, 6))
+    # fig4 = _new_figure((10, 6))
+    # ax4 = fig4.subplots()
     # fig4.suptitle('Database Size Comparison', fontsize=16, fontweight='normal')
     
     # db_names = []
@@ -324,62 +311,31 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
     #     ax4.set_ylabel('Size (MB)')
     #     ax4.set_xticks(range(len(db_names)))
     #     ax4.set_xticklabels(db_names)
-    #     for bar, size in zip(bars, sizes_mb):
-    #         ax4.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(sizes_mb)*0.02, 
-    #                f'{size:.2f} MB', ha='center', va='bottom', fontsize=10)
+    #     ax4.bar_label(bars, labels=[f'{size:.2f} MB' for size in sizes_mb], padding=3, fontsize=10)
     # else:
     #     ax4.text(0.5, 0.5, 'No database size data available',
     #             transform=ax4.transAxes, ha='center', va='center',
     #             fontsize=12, color='gray')
     
-    # plt.tight_layout()
+    # fig4.tight_layout()
     # size_plot_file = os.path.join(plots_dir, f'{scale}_{concurrency}_{transactions}_database_size_comparison.png')
-    # plt.savefig(size_plot_file, dpi=300, bbox_inches='tight')
-    # plt.close()
+    # fig4.savefig(size_plot_file, dpi=300, bbox_inches='tight')
     # print(f"Database size plot saved to: {size_plot_file}")
 
-    # Generate Resource Usage Plots (CPU & Memory)
-    if any(len(resource_usage[db]['timestamps']) > 0 for db in databases):
-        fig5, (ax5_cpu, ax5_mem) = plt.subplots(2, 1, figsize=(12, 10), sharex=True)
-        fig5.suptitle('Resource Usage Over Time', fontsize=16, fontweight='normal')
-        
-        for i, db in enumerate(databases):
-            if resource_usage[db]['timestamps']:
-                ax5_cpu.plot(resource_usage[db]['timestamps'], resource_usage[db]['cpu'], 
-                           label=db.title(), color=colors[i], linewidth=2)
-                ax5_mem.plot(resource_usage[db]['timestamps'], resource_usage[db]['memory'], 
-                           label=db.title(), color=colors[i], linewidth=2)
-        
-        ax5_cpu.set_ylabel('CPU Usage (Cores)')
-        ax5_cpu.set_title('CPU Usage')
-        ax5_cpu.legend()
-        ax5_cpu.grid(True, alpha=0.3)
-        
-        ax5_mem.set_ylabel('Memory Usage (MiB)')
-        ax5_mem.set_title('Memory Usage')
-        ax5_mem.set_xlabel('Time (seconds)')
-        ax5_mem.legend()
-        ax5_mem.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        # resource_plot_file = os.path.join(plots_dir, f'{scale}_{concurrency}_{transactions}_resource_usage.png')
-        # plt.savefig(resource_plot_file, dpi=300, bbox_inches='tight')
-        plt.close()
-        # print(f"Resource usage plot saved to: {resource_plot_file}")
-
     # Generate Combined Summary Plot (3x4)
-    fig_combined = plt.figure(figsize=(24, 24))
+    fig_combined = _new_figure((24, 24))
+    grid = fig_combined.add_gridspec(3, 4)
     fig_combined.suptitle(f'Postgres vs Elasticsearch Benchmark Summary ({scale})', fontsize=20, fontweight='normal')
     
     # Row 1: Startup, Data Loading, Total Query Duration, Database Size
     
     # 1. Startup Time (Top-Left)
-    ax_startup = plt.subplot2grid((3, 4), (0, 0), fig=fig_combined)
+    ax_startup = fig_combined.add_subplot(grid[0, 0])
     db_names = []
     startup_values = []
     for db in databases:
         if startup_times[db] is not None:
-            db_names.append(db.title())
+            db_names.append(titles[db])
             startup_values.append(startup_times[db])
 
     if startup_values:
@@ -388,14 +344,12 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
         ax_startup.set_ylabel('Time (s)')
         ax_startup.set_xticks(range(len(db_names)))
         ax_startup.set_xticklabels(db_names, rotation=0)
-        for bar, time in zip(bars, startup_values):
-            ax_startup.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01, f'{time:.2f}s', 
-                   ha='center', va='bottom', fontsize=10)
+        ax_startup.bar_label(bars, labels=[f'{time:.2f}s' for time in startup_values], padding=3, fontsize=10)
     else:
         ax_startup.text(0.5, 0.5, 'No data available', transform=ax_startup.transAxes, ha='center', va='center')
 
     # 2. Data Loading & Indexing Time (Top-Center-Left)
-    ax_loading = plt.subplot2grid((3, 4), (0, 1), fig=fig_combined)
+    ax_loading = fig_combined.add_subplot(grid[0, 1])
     db_names = []
     data_loading_values = []
     for db in databases:
@@ -403,7 +357,7 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
         if index_creation_times[db] is not None:
             value = (value or 0) + index_creation_times[db]
         if value is not None:
-            db_names.append(db.title())
+            db_names.append(titles[db])
             data_loading_values.append(value)
 
     if data_loading_values:
@@ -412,27 +366,22 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
         ax_loading.set_ylabel('Time (s)')
         ax_loading.set_xticks(range(len(db_names)))
         ax_loading.set_xticklabels(db_names, rotation=0)
-        for bar, time in zip(bars, data_loading_values):
-            ax_loading.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(data_loading_values)*0.02, 
-                   f'{time:.2f}s', ha='center', va='bottom', fontsize=10)
+        ax_loading.bar_label(bars, labels=[f'{time:.2f}s' for time in data_loading_values], padding=3, fontsize=10)
     else:
         ax_loading.text(0.5, 0.5, 'No data available', transform=ax_loading.transAxes, ha='center', va='center')
 
     # 3. Total Query Duration (Top-Center-Right)
-    ax_total = plt.subplot2grid((3, 4), (0, 2), fig=fig_combined)
+    ax_total = fig_combined.add_subplot(grid[0, 2])
     db_names = []
     totals = []
     for db in databases:
         if total_query_times[db] > 0:
-            db_names.append(db.title())
+            db_names.append(titles[db])
             totals.append(total_query_times[db])
 
     if totals:
         bars = ax_total.bar(range(len(db_names)), totals, color=colors[:len(db_names)], alpha=0.7)
-        for bar, total in zip(bars, totals):
-            height = bar.get_height()
-            ax_total.text(bar.get_x() + bar.get_width()/2., height + max(totals)*0.02,
-                   f'{total:.4f}', ha='center', va='bottom', fontweight='normal')
+        ax_total.bar_label(bars, labels=[f'{total:.4f}' for total in totals], padding=3, fontweight='normal')
         ax_total.set_title('Total Query Duration', fontweight='normal')
         ax_total.set_ylabel('Time (seconds)')
         ax_total.set_xticks(range(len(db_names)))
@@ -443,12 +392,12 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
         ax_total.text(0.5, 0.5, 'No data available', transform=ax_total.transAxes, ha='center', va='center')
 
     # 4. Database Size (Top-Right)
-    ax_c3 = plt.subplot2grid((3, 4), (0, 3), fig=fig_combined)
+    ax_c3 = fig_combined.add_subplot(grid[0, 3])
     db_names_size = []
     sizes_mb_combined = []
     for db in databases:
         if index_sizes[db] is not None:
-            db_names_size.append(db.title())
+            db_names_size.append(titles[db])
             sizes_mb_combined.append(index_sizes[db] / (1024 * 1024))
 
     if sizes_mb_combined:
@@ -457,65 +406,22 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
         ax_c3.set_title('Database Size Comparison', fontweight='normal')
         ax_c3.set_xticks(range(len(db_names_size)))
         ax_c3.set_xticklabels(db_names_size, rotation=0)
-        for bar, size in zip(bars, sizes_mb_combined):
-            ax_c3.text(bar.get_x() + bar.get_width()/2, bar.get_height(), f'{size:.2f} MB', 
-                      ha='center', va='bottom', fontsize=10)
+        ax_c3.bar_label(bars, labels=[f'{size:.2f} MB' for size in sizes_mb_combined], fontsize=10)
     else:
         ax_c3.text(0.5, 0.5, 'No data available', transform=ax_c3.transAxes, ha='center', va='center')
 
     # Row 2: Aggregated Time, Aggregated TPS
     
     # 5. Aggregated Time (Middle-Left)
-    ax_c1 = plt.subplot2grid((3, 4), (1, 0), colspan=2, fig=fig_combined)
-    x = np.arange(len(queries))
-    width = 0.35
-    
-    db_time_data = []
-    for db in databases:
-        times = [query_times[q][db] for q in queries]
-        db_time_data.append(times)
-
-    if any(any(t is not None for t in times) for times in db_time_data):
-        for i, db in enumerate(databases):
-            times = [query_times[q][db] for q in queries]
-            valid_times = [t for t in times if t is not None]
-            if valid_times:
-                ax_c1.bar(x + i*width, times, width, label=db.title(), color=colors[i], alpha=0.7)
-        
-        ax_c1.set_xlabel('Query Type')
-        ax_c1.set_ylabel('Time (seconds)')
-        ax_c1.set_title('Query Performance (Time)', fontweight='normal')
-        ax_c1.set_xticks(x + width/2)
-        ax_c1.set_xticklabels(query_labels, rotation=0)
-        ax_c1.legend()
-        ax_c1.grid(True, alpha=0.3, axis='y')
-        ax_c1.set_ylim(bottom=0)
-    else:
+    ax_c1 = fig_combined.add_subplot(grid[1, 0:2])
+    if not _plot_grouped_bars(ax_c1, db_titles, query_times, times_present, query_labels, colors,
+                              'Time (seconds)', 'Query Performance (Time)'):
         ax_c1.text(0.5, 0.5, 'No data available', transform=ax_c1.transAxes, ha='center', va='center')
 
     # 6. Aggregated TPS (Middle-Right)
-    ax_c2 = plt.subplot2grid((3, 4), (1, 2), colspan=2, fig=fig_combined)
-    db_tps_data_combined = []
-    for db in databases:
-        tps_values = [query_tps[q][db] for q in queries]
-        db_tps_data_combined.append(tps_values)
-
-    if any(any(t is not None for t in tps_values) for tps_values in db_tps_data_combined):
-        for i, db in enumerate(databases):
-            tps_values = [query_tps[q][db] for q in queries]
-            valid_tps = [t for t in tps_values if t is not None]
-            if valid_tps:
-                ax_c2.bar(x + i*width, tps_values, width, label=db.title(), color=colors[i], alpha=0.7)
-        
-        ax_c2.set_xlabel('Query Type')
-        ax_c2.set_ylabel('TPS')
-        ax_c2.set_title('Query Performance (TPS)', fontweight='normal')
-        ax_c2.set_xticks(x + width/2)
-        ax_c2.set_xticklabels(query_labels, rotation=0)
-        ax_c2.legend()
-        ax_c2.grid(True, alpha=0.3, axis='y')
-        ax_c2.set_ylim(bottom=0)
-    else:
+    ax_c2 = fig_combined.add_subplot(grid[1, 2:4])
+    if not _plot_grouped_bars(ax_c2, db_titles, query_tps, tps_present, query_labels, colors,
+                              'TPS', 'Query Performance (TPS)'):
         ax_c2.text(0.5, 0.5, 'No data available', transform=ax_c2.transAxes, ha='center', va='center')
 
     # Calculate query start times for each database
@@ -527,25 +433,24 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
         query_start_times[db] = start_time - 5 # Adjust for sleep delay
 
     # 7. Resource Usage - CPU (Bottom-Left)
-    ax_cpu = plt.subplot2grid((3, 4), (2, 0), colspan=2, fig=fig_combined)
+    ax_cpu = fig_combined.add_subplot(grid[2, 0:2])
     
     # 8. Resource Usage - Memory (Bottom-Right)
-    ax_mem = plt.subplot2grid((3, 4), (2, 2), colspan=2, fig=fig_combined)
+    ax_mem = fig_combined.add_subplot(grid[2, 2:4])
     
-    has_resource_data = False
+    has_resource_data = any(len(resource_usage[db]['timestamps']) for db in databases)
     for i, db in enumerate(databases):
-        if resource_usage[db]['timestamps']:
-            has_resource_data = True
+        if len(resource_usage[db]['timestamps']):
             # CPU plot
             ax_cpu.plot(resource_usage[db]['timestamps'], resource_usage[db]['cpu'], 
-                       label=f"{db.title()}", color=colors[i], linewidth=2)
+                       label=titles[db], color=colors[i], linewidth=2)
             # Memory plot
             ax_mem.plot(resource_usage[db]['timestamps'], resource_usage[db]['memory'], 
-                       label=f"{db.title()}", color=colors[i], linewidth=2)
+                       label=titles[db], color=colors[i], linewidth=2)
             # Add vertical line for query start on both plots
             if query_start_times[db] > 0:
-                ax_cpu.axvline(x=query_start_times[db], color=colors[i], linestyle=':', linewidth=2, label=f'{db.title()} Query Start')
-                ax_mem.axvline(x=query_start_times[db], color=colors[i], linestyle=':', linewidth=2, label=f'{db.title()} Query Start')
+                ax_cpu.axvline(x=query_start_times[db], color=colors[i], linestyle=':', linewidth=2, label=f'{titles[db]} Query Start')
+                ax_mem.axvline(x=query_start_times[db], color=colors[i], linestyle=':', linewidth=2, label=f'{titles[db]} Query Start')
     
     if has_resource_data:
         ax_cpu.set_xlabel('Time (s)')
@@ -563,112 +468,110 @@ def generate_plots(databases, results_dir='results', plots_dir='plots', scale=''
         ax_cpu.text(0.5, 0.5, 'No data available', transform=ax_cpu.transAxes, ha='center', va='center')
         ax_mem.text(0.5, 0.5, 'No data available', transform=ax_mem.transAxes, ha='center', va='center')
 
-    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
+    fig_combined.tight_layout(rect=[0, 0.03, 1, 0.95])
     combined_plot_file = os.path.join(plots_dir, f'{scale}_{concurrency}_{transactions}_combined_summary.png')
-    plt.savefig(combined_plot_file, dpi=300, bbox_inches='tight')
-    plt.close()
+    # Fast zlib setting: the 24x24in figure makes PNG encoding the dominant cost
+    fig_combined.savefig(combined_plot_file, dpi=dpi, bbox_inches='tight', pil_kwargs={'compress_level': 1})
     print(f"Combined summary plot saved to: {combined_plot_file}")
 
     # Generate summary text file
     summary_file = os.path.join(plots_dir, f'{scale}_{concurrency}_{transactions}_performance_summary.txt')
-    with open(summary_file, 'w') as f:
-        f.write("# Performance Comparison Summary\n\n")
-
-        # Add startup times
-        f.write("Startup Times:\n")
-        for db in databases:
-            if startup_times[db] is not None:
-                f.write(f"  {db.title()}: {startup_times[db]:.2f}s\n")
-            else:
-                f.write(f"  {db.title()}: N/A\n")
-
-        f.write("\n")
-
-        # Add data loading & indexing times
-        f.write("Data Loading & Indexing Times:\n")
-        for db in databases:
-            value = data_loading_times[db]
-            if index_creation_times[db] is not None:
-                value = (value or 0) + index_creation_times[db]
-            if value is not None:
-                f.write(f"  {db.title()}: {value:.2f}s\n")
-            else:
-                f.write(f"  {db.title()}: N/A\n")
+    parts = []
+    parts.append("# Performance Comparison Summary\n\n")
 
-        f.write("\n")
-        
-        # Add Database Sizes
-        f.write("Database Sizes:\n")
-        for db in databases:
-            if index_sizes[db] is not None:
-                f.write(f"  {db.title()}: {index_sizes[db] / (1024*1024):.2f} MB\n")
-            else:
-                f.write(f"  {db.title()}: N/A\n")
-        f.write("\n")
-        
-        # Add Resource Usage Summary (Peak)
-        f.write("Peak Resource Usage:\n")
-        for db in databases:
-            if resource_usage[db]['cpu']:
-                peak_cpu = max(resource_usage[db]['cpu'])
-                peak_mem = max(resource_usage[db]['memory'])
-                f.write(f"  {db.title()}: {peak_cpu:.2f} Cores, {peak_mem:.2f} MiB\n")
-            else:
-                f.write(f"  {db.title()}: N/A\n")
-        f.write("\n")
-
-        for i, (query, label) in enumerate(zip(queries, query_labels)):
-            f.write(f"Query {i+1}: {label}\n")
-
-            for db in databases:
-                time_seconds = query_times[query][db]
-                tps = query_tps[query][db]
-                if time_seconds is not None:
-                    f.write(f"  {db.title()}: {time_seconds:.4f}s")
-                    if tps is not None:
-                        f.write(f" ({tps:.2f} TPS)")
-                    f.write("\n")
-                else:
-                    f.write(f"  {db.title()}: N/A\n")
-
-            f.write("\n")
-
-        # Add total query durations
-        f.write("Total Query Duration:\n")
-        for db in databases:
-            if total_query_times[db] > 0:
-                f.write(f"  {db.title()}: {total_query_times[db]:.4f}s\n")
-            else:
-                f.write(f"  {db.title()}: N/A\n")
+    # Add startup times
+    parts.append("Startup Times:\n")
+    for db in databases:
+        if startup_times[db] is not None:
+            parts.append(f"  {titles[db]}: {startup_times[db]:.2f}s\n")
+        else:
+            parts.append(f"  {titles[db]}: N/A\n")
 
-        f.write("\n")
+    parts.append("\n")
 
-        # Add total durations
-        f.write("Total Workflow Duration (Setup + Ingest + Query):\n")
-        for db in databases:
-            if total_times[db] > 0:
-                f.write(f"  {db.title()}: {total_times[db]:.4f}s\n")
-            else:
-                f.write(f"  {db.title()}: N/A\n")
-
-        f.write("\n")
-
-        # Add TPS summary
-        f.write("TPS Summary (Average across queries):\n")
-        for db in databases:
-            total_tps = 0
-            count = 0
-            for query in queries:
-                if query_tps[query][db] is not None:
-                    total_tps += query_tps[query][db]
-                    count += 1
-            if count > 0:
-                avg_tps = total_tps / count
-                f.write(f"  {db.title()}: {avg_tps:.2f} TPS\n")
+    # Add data loading & indexing times
+    parts.append("Data Loading & Indexing Times:\n")
+    for db in databases:
+        value = data_loading_times[db]
+        if index_creation_times[db] is not None:
+            value = (value or 0) + index_creation_times[db]
+        if value is not None:
+            parts.append(f"  {titles[db]}: {value:.2f}s\n")
+        else:
+            parts.append(f"  {titles[db]}: N/A\n")
+
+    parts.append("\n")
+    
+    # Add Database Sizes
+    parts.append("Database Sizes:\n")
+    for db in databases:
+        if index_sizes[db] is not None:
+            parts.append(f"  {titles[db]}: {index_sizes[db] / (1024*1024):.2f} MB\n")
+        else:
+            parts.append(f"  {titles[db]}: N/A\n")
+    parts.append("\n")
+    
+    # Add Resource Usage Summary (Peak)
+    parts.append("Peak Resource Usage:\n")
+    for db in databases:
+        if len(resource_usage[db]['cpu']):
+            peak_cpu = resource_usage[db]['cpu'].max()
+            peak_mem = resource_usage[db]['memory'].max()
+            parts.append(f"  {titles[db]}: {peak_cpu:.2f} Cores, {peak_mem:.2f} MiB\n")
+        else:
+            parts.append(f"  {titles[db]}: N/A\n")
+    parts.append("\n")
+
+    for i, label in enumerate(query_labels):
+        parts.append(f"Query {i+1}: {label}\n")
+
+        for d, db in enumerate(databases):
+            time_seconds = query_times[d, i]
+            tps = query_tps[d, i]
+            if times_present[d, i]:
+                parts.append(f"  {titles[db]}: {time_seconds:.4f}s")
+                if tps_present[d, i]:
+                    parts.append(f" ({tps:.2f} TPS)")
+                parts.append("\n")
             else:
-                f.write(f"  {db.title()}: N/A\n")
+                parts.append(f"  {titles[db]}: N/A\n")
+
+        parts.append("\n")
+
+    # Add total query durations
+    parts.append("Total Query Duration:\n")
+    for db in databases:
+        if total_query_times[db] > 0:
+            parts.append(f"  {titles[db]}: {total_query_times[db]:.4f}s\n")
+        else:
+            parts.append(f"  {titles[db]}: N/A\n")
+
+    parts.append("\n")
+
+    # Add total durations
+    parts.append("Total Workflow Duration (Setup + Ingest + Query):\n")
+    for db in databases:
+        if total_times[db] > 0:
+            parts.append(f"  {titles[db]}: {total_times[db]:.4f}s\n")
+        else:
+            parts.append(f"  {titles[db]}: N/A\n")
+
+    parts.append("\n")
+
+    # Add TPS summary
+    parts.append("TPS Summary (Average across queries):\n")
+    tps_counts = tps_present.sum(axis=1)
+    tps_sums = np.nansum(query_tps, axis=1)
+    for d, db in enumerate(databases):
+        if tps_counts[d] > 0:
+            avg_tps = tps_sums[d] / tps_counts[d]
+            parts.append(f"  {titles[db]}: {avg_tps:.2f} TPS\n")
+        else:
+            parts.append(f"  {titles[db]}: N/A\n")
+
+    parts.append("\n")
 
-        f.write("\n")
+    Path(summary_file).write_text(''.join(parts))
 
     print(f"Summary text saved to: {summary_file}")
 
@@ -680,12 +583,13 @@ def main():
     parser.add_argument('--transactions', required=True, help='Number of transactions')
     parser.add_argument('--results-dir', required=True, help='Directory containing results')
     parser.add_argument('--plots-dir', required=True, help='Directory to save plots')
+    parser.add_argument('--dpi', type=int, default=150, help='Resolution of the combined summary plot')
 
     args = parser.parse_args()
 
     print(f"Generating plots for databases: {args.databases}, scale: {args.scale}, concurrency: {args.concurrency}, transactions: {args.transactions}")
 
-    generate_plots(args.databases, args.results_dir, args.plots_dir, args.scale, args.concurrency, args.transactions)
+    generate_plots(args.databases, args.results_dir, args.plots_dir, args.scale, args.concurrency, args.transactions, args.dpi)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -15,20 +15,29 @@ NC='\033[0m' # No Color
 # Default values
 DATABASES=("postgres" "elasticsearch")
 CONFIG_FILE="config/benchmark_config.json"
-SCALE=$(python3 scripts/config_reader.py "$CONFIG_FILE" "benchmark.scale" "small")
+
+# Load scale and resource defaults from config in a single Python invocation
+CONFIG_VALUES=$(python3 scripts/config_reader.py --batch "$CONFIG_FILE" \
+    "benchmark.scale=small" \
+    "resources.postgres.cpu_request" \
+    "resources.postgres.memory_request" \
+    "resources.elasticsearch.jvm_opts" \
+    "benchmark.transactions" \
+    "benchmark.concurrency")
+{
+    read -r SCALE
+    read -r CPU
+    read -r MEMORY
+    read -r JVM_OPTS
+    read -r TRANSACTIONS
+    read -r CONCURRENCY
+} <<< "$CONFIG_VALUES"
 
 # Define scale-prefixed directories
 DATA_DIR="data"
 RESULTS_DIR="results"
 PLOTS_DIR="plots"
 
-# Load resource defaults from config
-CPU=$(python3 scripts/config_reader.py "$CONFIG_FILE" "resources.postgres.cpu_request")
-MEMORY=$(python3 scripts/config_reader.py "$CONFIG_FILE" "resources.postgres.memory_request")
-JVM_OPTS=$(python3 scripts/config_reader.py "$CONFIG_FILE" "resources.elasticsearch.jvm_opts")
-TRANSACTIONS=$(python3 scripts/config_reader.py "$CONFIG_FILE" "benchmark.transactions")
-CONCURRENCY=$(python3 scripts/config_reader.py "$CONFIG_FILE" "benchmark.concurrency")
-
 
 # Function to print usage
 usage() {
@@ -77,6 +86,38 @@ print_error() {
     echo -e "${RED}[ERROR]${NC} $1"
 }
 
+# Function to read a timestamp in integer nanoseconds, for measuring durations only.
+# perl's CLOCK_MONOTONIC comes first so an NTP or manual clock step can't stretch or
+# shrink a measurement; it costs a process per call, which is negligible next to the
+# phases being timed. Where perl or a monotonic clock is missing, fall back to bash 5's
+# $EPOCHREALTIME and then whole seconds from date; both are wall-clock, so a clock
+# step during the run shows up in that duration
+timestamp_ns() {
+    if command -v perl &> /dev/null &&
+        perl -MTime::HiRes=clock_gettime,CLOCK_MONOTONIC -e 'printf "%.0f\n", clock_gettime(CLOCK_MONOTONIC) * 1e9' 2> /dev/null; then
+        return
+    elif [[ -n "${EPOCHREALTIME:-}" ]]; then
+        local usec="${EPOCHREALTIME/[.,]/}"
+        echo "${usec}000"
+    else
+        echo "$(date +%s)000000000"
+    fi
+}
+
+# Function to print the seconds between two timestamp_ns values, rounded to 3 decimals.
+# The sign is split off first because shell division truncates each part towards zero
+# (a wall-clock step back would otherwise print as "-1.-500"); adding half a millisecond
+# to the magnitude then turns that truncation into rounding
+elapsed_seconds() {
+    local ns=$(( $1 - $2 )) sign=""
+    if (( ns < 0 )); then
+        sign="-"
+        ns=$(( -ns ))
+    fi
+    ns=$(( ns + 500000 ))
+    printf "%s%d.%03d\n" "$sign" $(( ns / 1000000000 )) $(( ns / 1000000 % 1000 ))
+}
+
 # Function to check prerequisites
 check_prerequisites() {
     print_info "Checking prerequisites..."
@@ -270,7 +311,7 @@ setup_database() {
         kubectl apply -f k8s/namespace.yaml
 
         # Record deployment start time
-        local DEPLOYMENT_START=$(python3 scripts/get_time.py)
+        local DEPLOYMENT_START=$(timestamp_ns)
 
         # Deploy benchmark runner first
         print_info "Deploying benchmark runner..."
@@ -288,8 +329,8 @@ setup_database() {
         fi
 
         # Record deployment end time and calculate startup time
-        local DEPLOYMENT_END=$(python3 scripts/get_time.py)
-        local STARTUP_TIME=$(python3 scripts/timing.py $DEPLOYMENT_END $DEPLOYMENT_START)
+        local DEPLOYMENT_END=$(timestamp_ns)
+        local STARTUP_TIME=$(elapsed_seconds $DEPLOYMENT_END $DEPLOYMENT_START)
 
         # Save startup time to results directory
         echo "Startup time: ${STARTUP_TIME}s" > "$RESULTS_DIR/${SCALE}_${CONCURRENCY}_${TRANSACTIONS}_${db}_startup_time.txt"
@@ -335,7 +376,7 @@ run_benchmark() {
         if [[ "$db" == "postgres" ]]; then
             kubectl exec $runner_pod -- env DB_HOST=postgres-service DB_PORT=5432 POSTGRES_DB=benchmark_db POSTGRES_USER=benchmark_user POSTGRES_PASSWORD=benchmark_password_123 SCALE=$SCALE python3 -u /scripts/benchmark_postgres_fts.py --transactions $TRANSACTIONS --concurrency $CONCURRENCY
         elif [[ "$db" == "elasticsearch" ]]; then
-            kubectl exec $runner_pod -- env ES_HOST=elasticsearch-service ES_PORT=9200 INDEX_NAME=documents SCALE=$SCALE TRANSACTIONS=$TRANSACTIONS CONCURRENCY=$CONCURRENCY python3 -u /scripts/elasticsearch_benchmark.py
+            kubectl exec $runner_pod -- env ES_HOST=elasticsearch-service ES_PORT=9200 INDEX_NAME=documents SCALE=$SCALE TRANSACTIONS=$TRANSACTIONS CONCURRENCY=$CONCURRENCY ${BULK_BYTES:+BULK_BYTES=$BULK_BYTES} ${MSEARCH_BATCH:+MSEARCH_BATCH=$MSEARCH_BATCH} python3 -u /scripts/elasticsearch_benchmark.py
         fi
         
         # Copy results back
@@ -9,12 +9,16 @@ This is the Postgres-side benchmark runner for this repo.
 """
 
 import argparse
-import csv
+import functools
 import io
+import itertools
 import json
 import os
+import struct
 import sys
+import threading
 import time
+import uuid
 
 import psycopg2
 from psycopg2 import pool
@@ -24,6 +28,27 @@ try:
 except ImportError:
     pass
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    # json.loads accepts bytes as well, so data files can always be read in binary mode
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
+
+
+CONFIG_FILE = "/config/benchmark_config.json"
+
+
+@functools.lru_cache(maxsize=None)
+def load_benchmark_config():
+    """Read the benchmark configuration once; later callers share the parsed dict."""
+    with open(CONFIG_FILE, "r") as f:
+        return json.load(f)
+
 
 def create_connection_pool(host, port, dbname, user, password, min_conn=1, max_conn=10):
     try:
@@ -188,108 +213,210 @@ def create_table(host, port, user, password, db_name):
             conn.close()
 
 
-def load_data(host, port, user, password, db_name, scale, data_dir="/data"):
-    print("Loading data...")
+# Header and trailer of PostgreSQL's binary COPY format (no OIDs, no header extension)
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_PGCOPY_TRAILER = struct.pack("!h", -1)
 
-    start_time = time.perf_counter()
 
-    config_file = "/config/benchmark_config.json"
-    with open(config_file, "r") as f:
-        config = json.load(f)
+def _copy_binary(cursor, copy_sql, rows):
+    """Send rows of already-encoded field values through COPY ... (FORMAT BINARY)."""
+    buf = io.BytesIO()
+    buf.write(_PGCOPY_HEADER)
+    for fields in rows:
+        buf.write(struct.pack("!h", len(fields)))
+        for value in fields:
+            buf.write(struct.pack("!i", len(value)))
+            buf.write(value)
+    buf.write(_PGCOPY_TRAILER)
+    buf.seek(0)
+    cursor.copy_expert(copy_sql, buf)
 
-    scale_size_map = {"small": "small_scale", "medium": "medium_scale", "large": "large_scale"}
-    expected_size = config["data"][scale_size_map[scale]]
 
-    data_file = f"{data_dir}/documents_{scale}.json"
-    print(f"Loading data from {data_file}...")
+def _document_row(d):
+    return (uuid.UUID(d["id"]).bytes, d.get("title", "").encode(), d.get("content", "").encode())
 
-    batch_size = 10000
-    documents = []
-    count = 0
 
+def _child_row(d):
+    # jsonb binary input is a version byte followed by the JSON text. parent_id is spliced in
+    # front of the serialized data object rather than merged into a new dict for every row;
+    # jsonb keeps the last duplicate key, so data still wins as it did with the dict merge.
+    data = _json_dumps(d["data"])
+    payload = b'\x01{"parent_id":' + _json_dumps(d["parent_id"]) + (b"," + data[1:] if len(data) > 2 else b"}")
+    return (uuid.UUID(d["id"]).bytes, payload)
+
+
+# Read each JSON line as one CSV field; JSON escapes control characters, so neither byte can occur
+_COPY_LINES_OPTIONS = "(FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+
+
+def _load_data_server(host, port, user, password, db_name, data_file, child_data_file, expected_size):
+    """Have the server read and parse the data files itself; returns False if it cannot."""
     conn = None
     try:
         conn = psycopg2.connect(host=host, port=port, user=user, password=password, dbname=db_name)
-        conn.autocommit = True
         cursor = conn.cursor()
+        cursor.execute("SET LOCAL synchronous_commit = off")
 
-        with open(data_file, "r") as f:
-            for line in f:
-                try:
-                    doc = json.loads(line.strip())
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing line: {e}", file=sys.stderr)
-                    continue
-
-                documents.append(doc)
-                count += 1
-
-                if len(documents) >= batch_size:
-                    s_buf = io.StringIO()
-                    writer = csv.writer(s_buf)
-                    for d in documents:
-                        writer.writerow([d["id"], d.get("title", ""), d.get("content", "")])
-                    s_buf.seek(0)
-                    cursor.copy_expert(
-                        "COPY documents (id, title, content) FROM STDIN WITH (FORMAT CSV)", s_buf
-                    )
-                    documents = []
+        cursor.execute(
+            "CREATE TEMP TABLE staging_lines (line bigint GENERATED ALWAYS AS IDENTITY, doc jsonb) ON COMMIT DROP"
+        )
+        cursor.execute(f"COPY staging_lines (doc) FROM %s WITH {_COPY_LINES_OPTIONS}", (data_file,))
+        cursor.execute(
+            """
+            INSERT INTO documents (id, title, content)
+            SELECT (doc->>'id')::uuid, coalesce(doc->>'title', ''), coalesce(doc->>'content', '')
+            FROM staging_lines
+            WHERE line <= %s AND doc IS NOT NULL
+            """,
+            (expected_size,),
+        )
+        print(f"Loaded {cursor.rowcount} documents")
+
+        if os.path.exists(child_data_file):
+            print(f"Loading child data from {child_data_file}...")
+            cursor.execute("TRUNCATE staging_lines")
+            cursor.execute(f"COPY staging_lines (doc) FROM %s WITH {_COPY_LINES_OPTIONS}", (child_data_file,))
+            cursor.execute(
+                """
+                INSERT INTO child_documents (id, data)
+                SELECT (doc->>'id')::uuid, jsonb_build_object('parent_id', doc->'parent_id') || (doc->'data')
+                FROM staging_lines
+                WHERE doc IS NOT NULL
+                """
+            )
+            print(f"Loaded {cursor.rowcount} child documents")
+
+        conn.commit()
+        return True
+    except psycopg2.Error as e:
+        if conn:
+            conn.rollback()
+        print(f"Server-side COPY unavailable ({e}), streaming data from the client instead")
+        return False
+    finally:
+        if conn:
+            conn.close()
 
-                if count >= expected_size:
-                    break
 
-        if documents:
-            s_buf = io.StringIO()
-            writer = csv.writer(s_buf)
-            for d in documents:
-                writer.writerow([d["id"], d.get("title", ""), d.get("content", "")])
-            s_buf.seek(0)
-            cursor.copy_expert("COPY documents (id, title, content) FROM STDIN WITH (FORMAT CSV)", s_buf)
+def _load_data_client(host, port, user, password, db_name, data_file, child_data_file, expected_size):
+    batch_size = 50000
+    documents = []
+    count = 0
 
-        print(f"Loaded {count} documents")
+    # Postgres runs each COPY on a single backend, so spread batches over several connections
+    workers = min(8, os.cpu_count() or 1)
+    copy_pool = create_connection_pool(host, port, db_name, user, password, min_conn=workers, max_conn=workers)
+    pending = []
 
-        # Load children
-        child_data_file = f"{data_dir}/documents_child_{scale}.json"
-        if os.path.exists(child_data_file):
-            print(f"Loading child data from {child_data_file}...")
-            child_batch = []
-            child_count = 0
+    def copy_batch(copy_sql, rows):
+        conn = copy_pool.getconn()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("SET synchronous_commit = off")
+                _copy_binary(cursor, copy_sql, rows)
+        finally:
+            copy_pool.putconn(conn)
 
-            with open(child_data_file, "r") as f:
+    def submit(executor, copy_sql, rows):
+        # Bound the number of batches held in memory while workers catch up
+        if len(pending) >= 2 * workers:
+            pending.pop(0).result()
+        pending.append(executor.submit(copy_batch, copy_sql, rows))
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            with open(data_file, "rb", buffering=1 << 20) as f:
                 for line in f:
                     try:
-                        doc = json.loads(line.strip())
-                    except json.JSONDecodeError as e:
-                        print(f"Error parsing child line: {e}", file=sys.stderr)
+                        doc = _json_loads(line)
+                    except ValueError as e:
+                        print(f"Error parsing line: {e}", file=sys.stderr)
                         continue
 
-                    child_batch.append(doc)
-                    child_count += 1
-
-                    if len(child_batch) >= batch_size:
-                        s_buf = io.StringIO()
-                        writer = csv.writer(s_buf)
-                        for d in child_batch:
-                            writer.writerow([d["id"], json.dumps({"parent_id": d["parent_id"], **d["data"]})])
-                        s_buf.seek(0)
-                        cursor.copy_expert(
-                            "COPY child_documents (id, data) FROM STDIN WITH (FORMAT CSV)", s_buf
+                    documents.append(doc)
+                    count += 1
+
+                    if len(documents) >= batch_size:
+                        submit(
+                            executor,
+                            "COPY documents (id, title, content) FROM STDIN WITH (FORMAT BINARY)",
+                            map(_document_row, documents),
                         )
-                        child_batch = []
-
-            if child_batch:
-                s_buf = io.StringIO()
-                writer = csv.writer(s_buf)
-                for d in child_batch:
-                    writer.writerow([d["id"], json.dumps({"parent_id": d["parent_id"], **d["data"]})])
-                s_buf.seek(0)
-                cursor.copy_expert(
-                    "COPY child_documents (id, data) FROM STDIN WITH (FORMAT CSV)", s_buf
+                        documents = []
+
+                    if count >= expected_size:
+                        break
+
+            if documents:
+                submit(
+                    executor,
+                    "COPY documents (id, title, content) FROM STDIN WITH (FORMAT BINARY)",
+                    map(_document_row, documents),
                 )
 
-            print(f"Loaded {child_count} child documents")
+            print(f"Loaded {count} documents")
+
+            # Load children
+            if os.path.exists(child_data_file):
+                print(f"Loading child data from {child_data_file}...")
+                child_batch = []
+                child_count = 0
+
+                with open(child_data_file, "rb", buffering=1 << 20) as f:
+                    for line in f:
+                        try:
+                            doc = _json_loads(line)
+                        except ValueError as e:
+                            print(f"Error parsing child line: {e}", file=sys.stderr)
+                            continue
+
+                        child_batch.append(doc)
+                        child_count += 1
+
+                        if len(child_batch) >= batch_size:
+                            submit(
+                                executor,
+                                "COPY child_documents (id, data) FROM STDIN WITH (FORMAT BINARY)",
+                                map(_child_row, child_batch),
+                            )
+                            child_batch = []
+
+                if child_batch:
+                    submit(
+                        executor,
+                        "COPY child_documents (id, data) FROM STDIN WITH (FORMAT BINARY)",
+                        map(_child_row, child_batch),
+                    )
+
+                print(f"Loaded {child_count} child documents")
 
-        conn.commit()
+            for future in pending:
+                future.result()
+
+    finally:
+        copy_pool.closeall()
+
+
+def load_data(host, port, user, password, db_name, scale, data_dir="/data"):
+    print("Loading data...")
+
+    start_time = time.perf_counter()
+
+    config = load_benchmark_config()
+
+    scale_size_map = {"small": "small_scale", "medium": "medium_scale", "large": "large_scale"}
+    expected_size = config["data"][scale_size_map[scale]]
+
+    # The Postgres pod mounts the data directory at the same path as the benchmark runner
+    data_file = f"{data_dir}/documents_{scale}.json"
+    child_data_file = f"{data_dir}/documents_child_{scale}.json"
+    print(f"Loading data from {data_file}...")
+
+    try:
+        args = (host, port, user, password, db_name, data_file, child_data_file, expected_size)
+        if not _load_data_server(*args):
+            _load_data_client(*args)
 
         end_time = time.perf_counter()
         loading_time = end_time - start_time
@@ -300,9 +427,6 @@ def load_data(host, port, user, password, db_name, scale, data_dir="/data"):
     except Exception as e:
         print(f"Error during data loading: {e}", file=sys.stderr)
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def create_index(host, port, user, password, db_name):
@@ -316,29 +440,26 @@ def create_index(host, port, user, password, db_name):
         conn.autocommit = True
         cursor = conn.cursor()
 
-        cursor.execute("CREATE INDEX documents_fts_gin_idx ON documents USING gin (content_tsv);")
+        # Give this backend's index builds more memory for posting lists and let them run in parallel
+        cursor.execute("SET maintenance_work_mem = '2GB';")
+        cursor.execute("SET max_parallel_maintenance_workers = 8;")
+        cursor.execute("SET synchronous_commit = off;")
+
+        # fastupdate=off keeps GIN entries out of the pending list that queries would otherwise scan
+        cursor.execute(
+            "CREATE INDEX documents_fts_gin_idx ON documents USING gin (content_tsv) WITH (fastupdate = off);"
+        )
         cursor.execute(
             "CREATE INDEX child_documents_parent_id_idx ON child_documents USING btree (((data->>'parent_id')::uuid));"
         )
-        cursor.execute("CREATE INDEX child_documents_data_idx ON child_documents USING gin (data);")
+        cursor.execute("CREATE INDEX child_documents_data_idx ON child_documents USING gin (data jsonb_path_ops);")
 
-        # Wait for index creation completion (best-effort)
-        print("Waiting for index creation to complete...")
-        while True:
-            cursor.execute(
-                "SELECT blocks_done, blocks_total FROM pg_stat_progress_create_index WHERE pid = pg_backend_pid();"
-            )
-            result = cursor.fetchone()
-            if result is None:
-                print("Index creation completed.")
-                break
-            blocks_done, blocks_total = result
-            if blocks_total and blocks_done >= blocks_total:
-                print("Index creation completed.")
-                break
-            progress = (blocks_done / blocks_total) * 100 if blocks_total else 0
-            print(f"Index creation progress: {progress:.2f}% ({blocks_done}/{blocks_total})")
-            time.sleep(1)
+        cursor.execute("RESET maintenance_work_mem;")
+        cursor.execute("RESET max_parallel_maintenance_workers;")
+        cursor.execute("RESET synchronous_commit;")
+
+        # CREATE INDEX (without CONCURRENTLY) returns only once the build is finished
+        print("Index creation completed.")
 
         print("Running VACUUM ANALYZE...")
         old_isolation_level = conn.isolation_level
@@ -346,15 +467,7 @@ def create_index(host, port, user, password, db_name):
         cursor.execute("VACUUM ANALYZE documents;")
         cursor.execute("VACUUM ANALYZE child_documents;")
         conn.set_isolation_level(old_isolation_level)
-
-        print("Waiting for VACUUM ANALYZE to complete...")
-        while True:
-            cursor.execute("SELECT COUNT(*) FROM pg_stat_progress_vacuum;")
-            count = cursor.fetchone()[0]
-            if count == 0:
-                print("VACUUM ANALYZE completed.")
-                break
-            time.sleep(1)
+        print("VACUUM ANALYZE completed.")
 
         # Best-effort prewarm (extension may not be available)
         try:
@@ -370,6 +483,20 @@ def create_index(host, port, user, password, db_name):
             print(
                 f"Documents prewarm completed, {heap_blocks_loaded} blocks loaded into buffer cache."
             )
+
+            # Long content and tsvector values are TOASTed, so warm the TOAST table and its index too
+            print("Prewarming documents TOAST table...")
+            cursor.execute(
+                """
+                SELECT coalesce(sum(pg_prewarm(c.oid)), 0)
+                FROM pg_class t
+                JOIN pg_class c ON c.oid = t.reltoastrelid
+                    OR c.oid IN (SELECT indexrelid FROM pg_index WHERE indrelid = t.reltoastrelid)
+                WHERE t.oid = 'documents'::regclass AND t.reltoastrelid <> 0;
+                """
+            )
+            toast_blocks_loaded = cursor.fetchone()[0]
+            print(f"TOAST prewarm completed, {toast_blocks_loaded} blocks loaded into buffer cache.")
         except Exception as e:
             print(f"Skipping prewarm: {e}")
 
@@ -392,32 +519,94 @@ def create_index(host, port, user, password, db_name):
 def run_single_query(cursor, query_sql, params):
     start_time = time.perf_counter()
     cursor.execute(query_sql, params)
-    results = cursor.fetchall()
+    # The result set is only counted, so skip building Python tuples for each row
+    row_count = cursor.rowcount if cursor.rowcount >= 0 else sum(1 for _ in cursor)
     end_time = time.perf_counter()
-    return end_time - start_time, len(results)
+    return end_time - start_time, row_count
+
+
+def _positional_sql(query_sql):
+    """Rewrite psycopg2 %s placeholders as $1, $2, ... for use in PREPARE."""
+    parts = query_sql.split("%s")
+    return parts[0] + "".join(f"${n}{part}" for n, part in enumerate(parts[1:], start=1))
+
+
+# Use a CTE to compute the tsquery once per statement.
+_BASE_SELECT_RANKED = (
+    "WITH q AS (SELECT {tsquery} AS query) "
+    "SELECT id, title FROM documents, q "
+    "WHERE documents.content_tsv @@ q.query "
+    "ORDER BY ts_rank(documents.content_tsv, q.query) DESC "
+    "LIMIT %s;"
+)
+# Ranking has to fetch every matching tsvector from the heap, so only rank where it matters
+_BASE_SELECT_UNRANKED = (
+    "WITH q AS (SELECT {tsquery} AS query) "
+    "SELECT id, title FROM documents, q "
+    "WHERE documents.content_tsv @@ q.query "
+    "LIMIT %s;"
+)
+_PLAIN_SELECT = _BASE_SELECT_UNRANKED.format(tsquery="plainto_tsquery('english', %s)")
+_PHRASE_SELECT = _BASE_SELECT_RANKED.format(tsquery="phraseto_tsquery('english', %s)")
+_WEBSEARCH_SELECT = _BASE_SELECT_RANKED.format(tsquery="websearch_to_tsquery('english', %s)")
+_TSQUERY_SELECT = _BASE_SELECT_RANKED.format(tsquery="%s::tsquery")
+
+# websearch_to_tsquery input -> canonical tsquery text, filled by precompile_tsqueries
+_tsquery_cache = {}
+
+
+def _websearch_query(text, limit):
+    """Use the precompiled tsquery for a websearch string when one is cached."""
+    tsquery = _tsquery_cache.get(text)
+    if tsquery is None:
+        return _WEBSEARCH_SELECT, (text, limit)
+    return _TSQUERY_SELECT, (tsquery, limit)
+
+
+def precompile_tsqueries(conn_pool, queries_config):
+    """Parse every complex/boolean search string once so queries skip websearch_to_tsquery."""
+    complex_cfg = queries_config["complex"]
+    boolean_cfg = queries_config["boolean"]
+    texts = [
+        f"{term1} OR {term2}"
+        for term1, term2 in itertools.product(complex_cfg["term1s"], complex_cfg["term2s"])
+    ]
+    texts += [
+        f"{must} {should} -{not_term}"
+        for must, should, not_term in itertools.product(
+            boolean_cfg["must_terms"], boolean_cfg["should_terms"], boolean_cfg["not_terms"]
+        )
+    ]
+
+    conn = conn_pool.getconn()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT q, websearch_to_tsquery('english', q)::text FROM unnest(%s::text[]) AS q",
+                (sorted(set(texts)),),
+            )
+            _tsquery_cache.update(cursor.fetchall())
+    finally:
+        conn_pool.putconn(conn)
 
 
 def _query_templates(queries_config):
-    # Use a CTE to compute the tsquery once per statement.
-    base_select = (
-        "WITH q AS (SELECT {tsquery_func}('english', %s) AS query) "
-        "SELECT id, title FROM documents, q "
-        "WHERE documents.content_tsv @@ q.query "
-        "ORDER BY ts_rank_cd(documents.content_tsv, q.query) DESC "
-        "LIMIT %s;"
-    )
+    # websearch_to_tsquery keeps the positive terms ahead of the negation, but GIN can only skip
+    # the full-index scan for a negated term when at least one positive key is present
+    if not all(term.strip() for term in queries_config["boolean"]["must_terms"]):
+        raise ValueError("queries.boolean.must_terms must not contain empty terms")
 
     return {
         1: {
             "name": "Simple Search",
             "terms": queries_config["simple"]["terms"],
-            "build": lambda term: (base_select.format(tsquery_func="plainto_tsquery"), (term, 10)),
+            "build": lambda term: (_PLAIN_SELECT, (term, 10)),
         },
         2: {
             "name": "Phrase Search",
             "terms": queries_config["phrase"]["terms"],
             "build": lambda phrase: (
-                base_select.format(tsquery_func="phraseto_tsquery"),
+                _PHRASE_SELECT,
                 (phrase, 10),
             ),
         },
@@ -425,17 +614,14 @@ def _query_templates(queries_config):
             "name": "Complex Query",
             "term1s": queries_config["complex"]["term1s"],
             "term2s": queries_config["complex"]["term2s"],
-            "build": lambda term1, term2: (
-                base_select.format(tsquery_func="websearch_to_tsquery"),
-                (f"{term1} OR {term2}", 20),
-            ),
+            "build": lambda term1, term2: _websearch_query(f"{term1} OR {term2}", 20),
         },
         4: {
             "name": "Top-N Query",
             "terms": queries_config["top_n"]["terms"],
             "n": queries_config["top_n"]["n"],
             "build": lambda term, n: (
-                base_select.format(tsquery_func="plainto_tsquery"),
+                _PLAIN_SELECT,
                 (term, n),
             ),
         },
@@ -444,17 +630,14 @@ def _query_templates(queries_config):
             "must_terms": queries_config["boolean"]["must_terms"],
             "should_terms": queries_config["boolean"]["should_terms"],
             "not_terms": queries_config["boolean"]["not_terms"],
-            "build": lambda must, should, not_term: (
-                base_select.format(tsquery_func="websearch_to_tsquery"),
-                (f"{must} {should} -{not_term}", 10),
-            ),
+            "build": lambda must, should, not_term: _websearch_query(f"{must} {should} -{not_term}", 10),
         },
         6: {
             "name": "Join Query",
             "terms": queries_config["simple"]["terms"],
             "build": lambda term: (
                 "WITH q AS (SELECT plainto_tsquery('english', %s) AS query) "
-                "SELECT d.id, d.title, c.data "
+                "SELECT d.id "
                 "FROM documents d "
                 "JOIN child_documents c ON (c.data->>'parent_id')::uuid = d.id, q "
                 "WHERE d.content_tsv @@ q.query "
@@ -465,72 +648,115 @@ def _query_templates(queries_config):
     }
 
 
-def run_concurrent_queries(conn_pool, query_type, transactions, concurrency, quiet=False):
-    config_file = "/config/benchmark_config.json"
-    with open(config_file, "r") as f:
-        benchmark_config = json.load(f)
+def _build_query(query_type, cfg, i):
+    """Return (sql, params) for the i-th (0-based) transaction of a query type."""
+    if query_type == 3:
+        return cfg["build"](cfg["term1s"][i % len(cfg["term1s"])], cfg["term2s"][i % len(cfg["term2s"])])
+    if query_type == 4:
+        return cfg["build"](cfg["terms"][i % len(cfg["terms"])], cfg["n"])
+    if query_type == 5:
+        return cfg["build"](
+            cfg["must_terms"][i % len(cfg["must_terms"])],
+            cfg["should_terms"][i % len(cfg["should_terms"])],
+            cfg["not_terms"][i % len(cfg["not_terms"])],
+        )
+    return cfg["build"](cfg["terms"][i % len(cfg["terms"])])
+
 
-    queries_config = benchmark_config["queries"]
-    query_configs = _query_templates(queries_config)
+def run_concurrent_queries(conn_pool, query_type, transactions, concurrency, quiet=False, warmup=0):
+    query_configs = _query_templates(load_benchmark_config()["queries"])
 
     cfg = query_configs[query_type]
     if not quiet:
         print(f"Query {query_type}: {cfg['name']} ({transactions} iterations, concurrency: {concurrency})")
 
     transactions_per_worker = (transactions + concurrency - 1) // concurrency
+    warmup_per_worker = (warmup + concurrency - 1) // concurrency
+    stmt_name = f"benchmark_query_{query_type}"
 
-    def worker_task(worker_id):
+    # The wall clock starts once every worker has finished its warm-up transactions
+    measure_start = []
+    barrier = threading.Barrier(concurrency, action=lambda: measure_start.append(time.perf_counter()))
+
+    def worker_task(worker_id, conn):
         worker_time = 0.0
         worker_transactions = 0
 
-        conn = conn_pool.getconn()
         cursor = None
         try:
+            # The whole worker loop runs in one transaction; psycopg2 opens it with BEGIN READ ONLY
+            conn.set_session(readonly=True)
             cursor = conn.cursor()
+            cursor.execute("SET LOCAL synchronous_commit = off")
 
-            start_idx = (worker_id - 1) * transactions_per_worker + 1
+            start_idx = (worker_id - 1) * transactions_per_worker
             end_idx = min(worker_id * transactions_per_worker, transactions)
+            warmup_start = (worker_id - 1) * warmup_per_worker
+            warmup_end = min(worker_id * warmup_per_worker, warmup)
+
+            # Build every statement up front so the timed loop only executes
+            warmup_plan = [_build_query(query_type, cfg, i) for i in range(warmup_start, warmup_end)]
+            plan = [_build_query(query_type, cfg, i) for i in range(start_idx, end_idx)]
+
+            if warmup_plan or plan:
+                # Prepare the statement once per connection so each transaction skips parse and plan
+                query_sql, params = (warmup_plan or plan)[0]
+                cursor.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s", (stmt_name,))
+                if cursor.fetchone() is None:
+                    cursor.execute(f"PREPARE {stmt_name} AS {_positional_sql(query_sql)}")
+                execute_sql = f"EXECUTE {stmt_name} ({', '.join(['%s'] * len(params))})"
+
+            # Bind parameters ahead of time so each timed execute holds the GIL only to send bytes
+            warmup_statements = [cursor.mogrify(execute_sql, params) for _, params in warmup_plan]
+            statements = [cursor.mogrify(execute_sql, params) for _, params in plan]
+
+            for statement in warmup_statements:
+                cursor.execute(statement)
+
+            barrier.wait()
 
-            for i in range(start_idx, end_idx + 1):
-                if query_type == 3:
-                    term1 = cfg["term1s"][(i - 1) % len(cfg["term1s"])]
-                    term2 = cfg["term2s"][(i - 1) % len(cfg["term2s"])]
-                    query_sql, params = cfg["build"](term1, term2)
-                elif query_type == 4:
-                    term = cfg["terms"][(i - 1) % len(cfg["terms"])]
-                    query_sql, params = cfg["build"](term, cfg["n"])
-                elif query_type == 5:
-                    must = cfg["must_terms"][(i - 1) % len(cfg["must_terms"])]
-                    should = cfg["should_terms"][(i - 1) % len(cfg["should_terms"])]
-                    not_term = cfg["not_terms"][(i - 1) % len(cfg["not_terms"])]
-                    query_sql, params = cfg["build"](must, should, not_term)
-                else:
-                    term = cfg["terms"][(i - 1) % len(cfg["terms"])]
-                    query_sql, params = cfg["build"](term)
-
-                query_time, _ = run_single_query(cursor, query_sql, params)
+            for statement in statements:
+                query_time, _ = run_single_query(cursor, statement, None)
                 worker_time += query_time
                 worker_transactions += 1
 
+            conn.commit()
+
+        except BaseException:
+            # Release the other workers if this one can no longer reach the barrier
+            barrier.abort()
+            raise
         finally:
             if cursor:
                 cursor.close()
-            conn_pool.putconn(conn)
 
         return worker_time, worker_transactions
 
+    # Workers are statically partitioned, so give each one a dedicated connection up front
+    conns = [conn_pool.getconn() for _ in range(concurrency)]
+
     start_time = time.perf_counter()
     total_latency = 0.0
     completed_transactions = 0
 
-    with ThreadPoolExecutor(max_workers=concurrency) as executor:
-        futures = [executor.submit(worker_task, worker_id) for worker_id in range(1, concurrency + 1)]
-        for future in as_completed(futures):
-            worker_time, worker_transactions = future.result()
-            completed_transactions += worker_transactions
-            total_latency += worker_time
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(worker_task, worker_id, conns[worker_id - 1])
+                for worker_id in range(1, concurrency + 1)
+            ]
+            for future in as_completed(futures):
+                worker_time, worker_transactions = future.result()
+                completed_transactions += worker_transactions
+                total_latency += worker_time
+
+        end_time = time.perf_counter()
+        if measure_start:
+            start_time = measure_start[0]
+    finally:
+        for conn in conns:
+            conn_pool.putconn(conn)
 
-    end_time = time.perf_counter()
     wall_time = end_time - start_time
     avg_latency = total_latency / transactions if transactions > 0 else 0.0
 
@@ -545,22 +771,8 @@ def run_concurrent_queries(conn_pool, query_type, transactions, concurrency, qui
 def run_explain_analyze(conn_pool, query_type, scale):
     print(f"Running EXPLAIN ANALYZE for Query {query_type}...")
 
-    config_file = "/config/benchmark_config.json"
-    with open(config_file, "r") as f:
-        benchmark_config = json.load(f)
-
-    queries_config = benchmark_config["queries"]
-    query_configs = _query_templates(queries_config)
-    cfg = query_configs[query_type]
-
-    if query_type == 3:
-        query_sql, params = cfg["build"](cfg["term1s"][0], cfg["term2s"][0])
-    elif query_type == 4:
-        query_sql, params = cfg["build"](cfg["terms"][0], cfg["n"])
-    elif query_type == 5:
-        query_sql, params = cfg["build"](cfg["must_terms"][0], cfg["should_terms"][0], cfg["not_terms"][0])
-    else:
-        query_sql, params = cfg["build"](cfg["terms"][0])
+    query_configs = _query_templates(load_benchmark_config()["queries"])
+    query_sql, params = _build_query(query_type, query_configs[query_type], 0)
 
     explain_sql = f"EXPLAIN ANALYZE {query_sql}"
 
@@ -634,7 +846,7 @@ def main():
         args.user,
         args.password,
         min_conn=args.concurrency,
-        max_conn=args.concurrency * 2,
+        max_conn=args.concurrency,
     )
 
     conn = benchmark_pool.getconn()
@@ -647,20 +859,9 @@ def main():
     finally:
         benchmark_pool.putconn(conn)
 
-    try:
-        if not args.quiet:
-            print("Warming up...")
-
-        for query_type in [1, 2, 3, 4, 5, 6]:
-            run_explain_analyze(benchmark_pool, query_type, args.scale)
-            run_concurrent_queries(
-                benchmark_pool,
-                query_type,
-                transactions=10,
-                concurrency=args.concurrency,
-                quiet=True,
-            )
+    precompile_tsqueries(benchmark_pool, load_benchmark_config()["queries"])
 
+    try:
         if not args.quiet:
             print("Running benchmark queries...")
 
@@ -685,12 +886,16 @@ def main():
             pass
 
         for query_type in [1, 2, 3, 4, 5, 6]:
+            run_explain_analyze(benchmark_pool, query_type, args.scale)
+
+            # Warm-up transactions run on the same connections, untimed, right before measurement
             avg_latency, total_time = run_concurrent_queries(
                 benchmark_pool,
                 query_type,
                 args.transactions,
                 args.concurrency,
                 args.quiet,
+                warmup=10,
             )
 
             results["metrics"][f"query_{query_type}"] = {
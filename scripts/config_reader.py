@@ -2,44 +2,56 @@
 """
 Config Reader Script
 Extracts values from JSON config files using dot notation paths.
+
+With --batch, several paths (each optionally suffixed with =default) are
+resolved in one invocation and printed one value per line, in order.
 """
 
 import json
 import sys
+from functools import reduce
 from typing import Any
 
 def get_nested_value(data: dict, path: str) -> Any:
     """Get nested value from dict using dot notation."""
-    keys = path.split('.')
-    current = data
-    for key in keys:
-        if isinstance(current, dict) and key in current:
-            current = current[key]
-        else:
-            return None
-    return current
+    # dict.__getitem__ raises TypeError for non-dict hops, so no per-segment isinstance check
+    try:
+        return reduce(dict.__getitem__, path.split('.'), data)
+    except (KeyError, TypeError):
+        return None
 
-def main():
-    if len(sys.argv) < 3 or len(sys.argv) > 4:
-        print("Usage: python3 config_reader.py <config_file> <path> [default_value]", file=sys.stderr)
-        sys.exit(1)
+def resolve(config: dict, path: str, default_value: Any) -> Any:
+    """Return the value at path, the default, or exit if neither is available."""
+    value = get_nested_value(config, path)
+    if value is not None:
+        return value
+    if default_value is not None:
+        return default_value
+    print(f"Path '{path}' not found in config", file=sys.stderr)
+    sys.exit(1)
 
-    config_file = sys.argv[1]
-    path = sys.argv[2]
-    default_value = sys.argv[3] if len(sys.argv) == 4 else None
+def main():
+    batch = len(sys.argv) > 1 and sys.argv[1] == '--batch'
+    if batch:
+        if len(sys.argv) < 4:
+            print("Usage: python3 config_reader.py --batch <config_file> <path[=default]>...", file=sys.stderr)
+            sys.exit(1)
+        config_file = sys.argv[2]
+        lookups = [arg.partition('=')[::2] if '=' in arg else (arg, None) for arg in sys.argv[3:]]
+    else:
+        if len(sys.argv) < 3 or len(sys.argv) > 4:
+            print("Usage: python3 config_reader.py <config_file> <path> [default_value]", file=sys.stderr)
+            sys.exit(1)
+        config_file = sys.argv[1]
+        lookups = [(sys.argv[2], sys.argv[3] if len(sys.argv) == 4 else None)]
 
     try:
         with open(config_file, 'r') as f:
             config = json.load(f)
 
-        value = get_nested_value(config, path)
-        if value is not None:
-            print(value)
-        elif default_value is not None:
-            print(default_value)
-        else:
-            print(f"Path '{path}' not found in config", file=sys.stderr)
-            sys.exit(1)
+        # Resolve everything before printing so a missing path never leaves partial output
+        values = [resolve(config, path, default_value) for path, default_value in lookups]
+        print('\n'.join(str(value) for value in values))
     except FileNotFoundError:
         print(f"Config file '{config_file}' not found", file=sys.stderr)
         sys.exit(1)
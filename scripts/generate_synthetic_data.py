@@ -6,18 +6,37 @@ Generates documents using English dictionary words to construct sentences
 
 import sys
 import json
-import random
-import string
 import os
+import pickle
+import re
 import urllib.request
 import gzip
+import hashlib
+import itertools
+import math
 import tempfile
 import multiprocessing
 import uuid
+from multiprocessing import shared_memory
 import argparse
 
+import numpy as np
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_dumps(obj):
+        # Compact UTF-8 output, byte-for-byte what orjson would write
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+def _words_cache_path(url):
+    """Location of the cached word list downloaded from url"""
+    url_hash = hashlib.sha1(url.encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"synthetic_words_{url_hash}.pkl")
+
 def download_english_words():
-    """Download a comprehensive English word list"""
+    """Download a comprehensive English word list, reusing a previous run's download if cached"""
     # Use a reliable source for English words
     word_urls = [
         "https://raw.githubusercontent.com/dwyl/english-words/master/words_dictionary.json",
@@ -26,6 +45,16 @@ def download_english_words():
 
     words = []
 
+    for url in word_urls:
+        cache_file = _words_cache_path(url)
+        try:
+            with open(cache_file, 'rb') as f:
+                words = pickle.load(f)
+            print(f"Loaded {len(words)} cached words for {url}", file=sys.stderr)
+            return words
+        except (OSError, pickle.UnpicklingError, EOFError):
+            continue
+
     for url in word_urls:
         try:
             print(f"Downloading word list from {url}...", file=sys.stderr)
@@ -40,9 +69,17 @@ def download_english_words():
 
             if len(words) > 1000:  # Ensure we have a good word list
                 print(f"Downloaded {len(words)} words", file=sys.stderr)
+                # Write-then-rename so a concurrent or interrupted run never sees a partial cache
+                cache_file = _words_cache_path(url)
+                try:
+                    with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(cache_file), delete=False) as f:
+                        pickle.dump(words, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(f.name, cache_file)
+                except OSError as e:
+                    print(f"Failed to cache word list: {e}", file=sys.stderr)
                 return words
         except Exception as e:
-            print(f"Failed to download from {url}: {e}")
+            print(f"Failed to download from {url}: {e}", file=sys.stderr)
             continue
 
     # Fallback: generate basic words
@@ -199,73 +236,184 @@ def download_english_words():
     print(f"Using {len(words)} fallback words", file=sys.stderr)
     return words
 
+# SHA-1 state after the namespace bytes; uuid5 of a name is this state fed with the name
+_DNS_SHA1 = hashlib.sha1(uuid.NAMESPACE_DNS.bytes)
+
 def get_deterministic_uuid(int_id):
-    """Generate a deterministic UUID from an integer ID"""
-    return str(uuid.uuid5(uuid.NAMESPACE_DNS, str(int_id)))
-
-def generate_sentence(words, min_words=5, max_words=20):
-    """Generate a random sentence using dictionary words"""
-    num_words = random.randint(min_words, max_words)
-    sentence_words = random.choices(words, k=num_words)
-
-    # Capitalize first word
-    if sentence_words:
-        sentence_words[0] = sentence_words[0].capitalize()
-
-    # Add punctuation
-    punctuation = random.choice(['.', '!', '?'])
-    sentence = ' '.join(sentence_words) + punctuation
-
-    return sentence
-
-def generate_title(words):
-    """Generate a random title (shorter sentence)"""
-    return generate_sentence(words, min_words=2, max_words=8).rstrip('.!?')
-
-def generate_document(doc_id, words):
-    """Generate a single document with title and content"""
-    title = generate_title(words)
-    # Generate content as multiple sentences
-    num_sentences = random.randint(3, 10)
-    content_sentences = [generate_sentence(words) for _ in range(num_sentences)]
-    content = ' '.join(content_sentences)
-
-    return {
-        'id': get_deterministic_uuid(doc_id),
-        'title': title,
-        'content': content
-    }
-
-def generate_child_document(parent_id_range):
-    """Generate a child document with a reference to a parent"""
-    parent_id = random.randint(1, parent_id_range)
-    return {
-        'id': str(uuid.uuid4()),
-        'parent_id': get_deterministic_uuid(parent_id),
-        'data': {
-            'status': random.choice(['active', 'inactive', 'pending', 'archived']),
-            'priority': random.choice(['high', 'medium', 'low']),
-            'score': round(random.random() * 100, 2),
-            'tags': random.sample(['urgent', 'review', 'legacy', 'new', 'flagged'], k=random.randint(1, 3)),
-            'metadata': {
-                'created_at': f"202{random.randint(0, 4)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
-                'version': random.randint(1, 10)
-            }
-        }
-    }
+    """Generate a deterministic UUID from an integer ID (same value as uuid.uuid5 on NAMESPACE_DNS)"""
+    sha = _DNS_SHA1.copy()
+    sha.update(str(int_id).encode())
+    raw = bytearray(sha.digest()[:16])
+    # Version 5 and RFC 4122 variant bits, set the way uuid.UUID(version=5) does
+    raw[6] = (raw[6] & 0x0F) | 0x50
+    raw[8] = (raw[8] & 0x3F) | 0x80
+    h = raw.hex()
+    return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+def random_uuids(count, rng):
+    """Generate count random (version 4) UUID strings from one draw of the batch's generator"""
+    raw = rng.integers(0, 256, size=(count, 16), dtype=np.uint8)
+    # Version 4 and RFC 4122 variant bits, set the way uuid.uuid4 does
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    h = raw.tobytes().hex()
+    return [
+        f'{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}'
+        for i in range(0, 32 * count, 32)
+    ]
+
+PUNCTUATION = np.array([b'.', b'!', b'?'], dtype=object)
+
+# Parent records have a fixed shape, so they are written straight into this template
+# instead of building a dict per document and handing it to a generic encoder
+PARENT_RECORD = b'{"id":"%s","title":"%s","content":"%s"}'
+
+def _json_escape(raw):
+    """JSON-escape UTF-8 text for embedding between quotes"""
+    return _json_dumps(raw.decode())[1:-1]
+
+def generate_document_batch(start, end, words_arr, capitalized_arr, rng):
+    """Generate documents start+1..end as encoded JSON records, drawing title lengths,
+    sentence counts, sentence lengths, words and punctuation in a few bulk RNG calls;
+    the words must already be safe to embed in a JSON string"""
+    num_docs = end - start
+    # Titles are short unpunctuated sentences of 2-8 words
+    title_lengths = rng.integers(2, 9, size=num_docs)
+    title_idx = rng.integers(0, len(words_arr), size=int(title_lengths.sum()))
+    sentence_counts = rng.integers(3, 11, size=num_docs)
+    sentence_lengths = rng.integers(5, 21, size=int(sentence_counts.sum()))
+    content_idx = rng.integers(0, len(words_arr), size=int(sentence_lengths.sum()))
+    punctuation = PUNCTUATION[rng.integers(0, 3, size=len(sentence_lengths))]
+
+    # Capitalize and punctuate on the gathered arrays: each sentence's first word comes
+    # from the pre-capitalized table and its last word gets the mark appended, so a
+    # document's sentences are just its words joined by spaces
+    title_words = words_arr[title_idx]
+    title_starts = np.cumsum(title_lengths) - title_lengths
+    title_words[title_starts] = capitalized_arr[title_idx[title_starts]]
+
+    content_words = words_arr[content_idx]
+    sentence_ends = np.cumsum(sentence_lengths)
+    sentence_starts = sentence_ends - sentence_lengths
+    content_words[sentence_starts] = capitalized_arr[content_idx[sentence_starts]]
+    content_words[sentence_ends - 1] += punctuation
+    doc_word_counts = np.add.reduceat(sentence_lengths, np.cumsum(sentence_counts) - sentence_counts)
+
+    title_words = title_words.tolist()
+    content_words = content_words.tolist()
+    records = []
+    title_pos = 0
+    word_pos = 0
+    for offset, (title_length, word_count) in enumerate(zip(title_lengths.tolist(), doc_word_counts.tolist())):
+        records.append(PARENT_RECORD % (
+            get_deterministic_uuid(start + offset + 1).encode(),
+            b' '.join(title_words[title_pos:title_pos + title_length]),
+            b' '.join(content_words[word_pos:word_pos + word_count])
+        ))
+        title_pos += title_length
+        word_pos += word_count
+    return records
+
+STATUSES = np.array(['active', 'inactive', 'pending', 'archived'], dtype=object)
+PRIORITIES = np.array(['high', 'medium', 'low'], dtype=object)
+TAGS = ['urgent', 'review', 'legacy', 'new', 'flagged']
+
+# Every ordered selection of 1-3 distinct tags (5 + 20 + 60), grouped by length, so a
+# document's tags are one table lookup; TAG_SUBSET_OFFSETS[k - 1] is where length k starts
+TAG_SUBSETS = np.empty(sum(math.perm(len(TAGS), k) for k in (1, 2, 3)), dtype=object)
+TAG_SUBSETS[:] = [list(p) for k in (1, 2, 3) for p in itertools.permutations(TAGS, k)]
+TAG_SUBSET_COUNTS = np.array([math.perm(len(TAGS), k) for k in (1, 2, 3)])
+TAG_SUBSET_OFFSETS = np.cumsum(TAG_SUBSET_COUNTS) - TAG_SUBSET_COUNTS
+TAG_SUBSETS_JSON = np.array([_json_dumps(tags).decode() for tags in TAG_SUBSETS], dtype=object)
+
+# Every creation date a child can get (days 1-28 of 2020-2024), formatted once
+DATES = np.array([f"202{year}-{month:02d}-{day:02d}"
+                  for year in range(5) for month in range(1, 13) for day in range(1, 29)], dtype=object)
+
+# Child records are formatted straight into this template: every string field is drawn
+# from a fixed table of plain identifiers (tags as pre-encoded JSON arrays), and %r
+# gives a float the same shortest repr the JSON encoders write
+CHILD_RECORD = ('{"id":"%s","parent_id":"%s","data":{"status":"%s","priority":"%s","score":%r,'
+                '"tags":%s,"metadata":{"created_at":"%s","version":%d}}}')
+
+def generate_child_batch(num_docs, parent_id_range, rng):
+    """Generate child documents referencing random parents as NDJSON bytes, sampling each
+    field for the whole batch in one RNG call so only formatting runs per document"""
+    parent_ids = rng.integers(1, parent_id_range + 1, size=num_docs).tolist()
+    statuses = STATUSES[rng.integers(0, len(STATUSES), size=num_docs)].tolist()
+    priorities = PRIORITIES[rng.integers(0, len(PRIORITIES), size=num_docs)].tolist()
+    scores = np.round(rng.random(num_docs) * 100, 2).tolist()
+    # Pick 1-3 tags uniformly, then one ordered selection of that many uniformly, the
+    # same distribution as random.sample with a random k
+    tag_sizes = rng.integers(0, 3, size=num_docs)
+    tags = TAG_SUBSETS_JSON[TAG_SUBSET_OFFSETS[tag_sizes] + rng.integers(0, TAG_SUBSET_COUNTS[tag_sizes])].tolist()
+    dates = DATES[rng.integers(0, len(DATES), size=num_docs)].tolist()
+    versions = rng.integers(1, 11, size=num_docs).tolist()
+    child_ids = random_uuids(num_docs, rng)
+
+    return '\n'.join([
+        CHILD_RECORD % (child_id, get_deterministic_uuid(parent_id), status, priority, score, doc_tags,
+                        created_at, version)
+        for child_id, parent_id, status, priority, score, doc_tags, created_at, version in zip(
+            child_ids, parent_ids, statuses, priorities, scores, tags, dates, versions)
+    ]).encode() + b'\n'
+
+# Word table for the current worker process and its capitalized twin, installed once by _init_worker
+_WORDS = None
+_CAPITALIZED = None
+
+def _init_worker(shm_name, dtype, count):
+    """Pool initializer: read the word table from shared memory instead of receiving it pickled"""
+    global _WORDS, _CAPITALIZED
+    if shm_name is None:
+        _WORDS = _CAPITALIZED = np.empty(0, dtype=object)
+        return
+    shm = shared_memory.SharedMemory(name=shm_name)
+    table = np.ndarray((count,), dtype=dtype, buffer=shm.buf)
+    # Fancy-indexing an object array of bytes is several times faster than gathering from
+    # the fixed-width table, so unpack it once and detach
+    _WORDS = np.array(table.tolist(), dtype=object)
+    _CAPITALIZED = np.array(np.char.capitalize(table).tolist(), dtype=object)
+    # JSON escaping works character by character, so escaping the table once covers every
+    # field built from it; dictionary words normally contain nothing that needs it
+    if re.search(rb'["\\\x00-\x1f]', b''.join(_WORDS.tolist())):
+        _WORDS = np.array([_json_escape(word) for word in _WORDS.tolist()], dtype=object)
+        _CAPITALIZED = np.array([_json_escape(word) for word in _CAPITALIZED.tolist()], dtype=object)
+    del table
+    shm.close()
 
 def generate_batch(args):
-    """Generate a batch of documents in parallel"""
-    start, end, words, seed_offset, mode, total_parents = args
-    random.seed(42 + seed_offset)  # Different seed per process for reproducibility
-    docs = []
-    for i in range(start, end):
-        if mode == 'child':
-            doc = generate_child_document(total_parents)
-        else:
-            doc = generate_document(i + 1, words)
-        docs.append(json.dumps(doc))
-    return docs
+    """Generate a batch of documents in parallel; returns (count, ndjson bytes) so only one
+    buffer per batch crosses the result queue"""
+    start, end, seed, mode, total_parents = args
+    # All randomness comes from one PCG64 generator per batch, seeded with the batch's own
+    # SeedSequence so output is reproducible however batches land on workers
+    rng = np.random.Generator(np.random.PCG64(seed))
+    if mode == 'child':
+        data = generate_child_batch(end - start, total_parents, rng)
+    else:
+        data = b'\n'.join(generate_document_batch(start, end, _WORDS, _CAPITALIZED, rng)) + b'\n'
+    return end - start, data
+
+def _load_expected_size(config_file, scale):
+    """Read the document count for a scale from the config in a single parse, accepting
+    either data.datasets.<scale>.size or the flat data.<scale>_scale key"""
+    if config_file and os.path.exists(config_file):
+        with open(config_file, 'rb') as f:
+            data = json.load(f).get('data', {})
+        dataset = data.get('datasets', {}).get(scale)
+        if dataset and 'size' in dataset:
+            return dataset['size']
+        if f'{scale}_scale' in data:
+            return data[f'{scale}_scale']
+
+    # Fallback sizes
+    size_map = {'small': 100, 'medium': 1000, 'large': 5000}
+    expected_size = size_map.get(scale, 100)
+    print(f"No size configured for {scale} scale, using fallback size {expected_size}", file=sys.stderr)
+    return expected_size
+
+OUTPUT_BUFFER_BYTES = 16 * 1024 * 1024
 
 def generate_dataset(scale, mode='parent', output_file=None, config_file=None):
     """Generate a complete dataset for the given scale"""
@@ -281,31 +429,8 @@ def generate_dataset(scale, mode='parent', output_file=None, config_file=None):
             if os.path.exists(cf):
                 config_file = cf
                 break
-        else:
-            # Fallback: use hardcoded sizes
-            size_map = {'small': 100, 'medium': 1000, 'large': 5000}
-            expected_size = size_map.get(scale, 100)
-            print(f"Using fallback size {expected_size} for {scale} scale")
-    else:
-        with open(config_file, 'r') as f:
-            config = json.load(f)
-        expected_size = config['data']['datasets'][scale]['size']
     
-    if config_file and os.path.exists(config_file):
-        with open(config_file, 'r') as f:
-            config = json.load(f)
-        # Map scale to config field
-        scale_size_map = {
-            'small': 'small_scale',
-            'medium': 'medium_scale',
-            'large': 'large_scale'
-        }
-        expected_size = config['data'][scale_size_map[scale]]
-    else:
-        # Fallback sizes
-        size_map = {'small': 100, 'medium': 1000, 'large': 5000}
-        expected_size = size_map.get(scale, 100)
-        print(f"Config file not found, using fallback size {expected_size} for {scale} scale", file=sys.stderr)
+    expected_size = _load_expected_size(config_file, scale)
 
     print(f"Generating {expected_size} synthetic {mode} documents for {scale} scale...", file=sys.stderr)
 
@@ -314,34 +439,74 @@ def generate_dataset(scale, mode='parent', output_file=None, config_file=None):
     if mode == 'parent':
         words = download_english_words()
 
-    # Generate documents in parallel batches
-    batch_size = 10000
+    # Publish the words once in a shared-memory block as a fixed-width byte table; workers
+    # read it from there rather than having the list pickled through the pool. Duplicates
+    # and non-ASCII entries are dropped and the rest sorted, so the table is compact and
+    # seeded output does not depend on the order the word source returned them in
+    words_table = np.array(sorted({word.encode('ascii') for word in words if word and word.isascii()}), dtype=bytes)
+    words_shm = None
+    if words_table.nbytes:
+        words_shm = shared_memory.SharedMemory(create=True, size=words_table.nbytes)
+        np.ndarray(words_table.shape, dtype=words_table.dtype, buffer=words_shm.buf)[:] = words_table
+    initargs = (words_shm.name if words_shm else None, words_table.dtype.str, len(words_table))
+
+    # Generate documents in parallel batches; large datasets use bigger batches so
+    # fewer, larger results cross the pool's result queue
+    batch_size = 50000 if scale == 'large' else 10000
     num_processes = min(8, multiprocessing.cpu_count())
     
-    with multiprocessing.Pool(processes=num_processes) as pool:
-        tasks = []
-        seed_offset = 0
-        for start in range(0, expected_size, batch_size):
-            end = min(start + batch_size, expected_size)
-            tasks.append((start, end, words, seed_offset, mode, expected_size))
-            seed_offset += 1
-        
-        for result in pool.imap(generate_batch, tasks):
-            for doc_json in result:
-                print(doc_json)
-            print(f"Generated {len(result)} more documents...", file=sys.stderr)
+    # Batches arrive as bytes, so write them to a binary stream. A file output gets a
+    # 16 MiB buffer so the disk sees a few large writes even when batches are small;
+    # on stdout, flush the text layer first so anything already printed stays ahead
+    # of the data. Batches are megabytes, so stdout's own buffer passes them straight
+    # to the fd in one write
+    if output_file:
+        out = open(output_file, 'wb', buffering=OUTPUT_BUFFER_BYTES)
+    else:
+        sys.stdout.flush()
+        out = sys.stdout.buffer
+    
+    # Workers come from a forkserver where one is available: it imports the heavy modules
+    # once and forks clean workers from there, rather than forking this process with the
+    # downloaded word list in it (or re-importing everything per worker under spawn)
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload(['numpy', 'orjson'])
+    else:
+        ctx = multiprocessing.get_context()
+
+    try:
+        with ctx.Pool(processes=num_processes, initializer=_init_worker, initargs=initargs) as pool:
+            # Each batch gets an independent child of one root SeedSequence, rather than
+            # neighbouring integer seeds, so batch streams are statistically independent
+            starts = range(0, expected_size, batch_size)
+            seeds = np.random.SeedSequence(42).spawn(len(starts))
+            tasks = [
+                (start, min(start + batch_size, expected_size), seed, mode, expected_size)
+                for start, seed in zip(starts, seeds)
+            ]
+            
+            # imap yields batches in task order, so a given seed always produces the same file
+            for count, data in pool.imap(generate_batch, tasks):
+                out.write(data)
+                print(f"Generated {count} more documents...", file=sys.stderr)
+        out.flush()
+    finally:
+        if output_file:
+            out.close()
+        if words_shm:
+            words_shm.close()
+            words_shm.unlink()
 
 def main():
     parser = argparse.ArgumentParser(description='Generate synthetic data for benchmarks')
     parser.add_argument('scale', choices=['small', 'medium', 'large'], help='Data scale')
     parser.add_argument('--mode', choices=['parent', 'child'], default='parent', help='Type of documents to generate')
+    parser.add_argument('-o', '--output', help='File to write the documents to (default: stdout)')
     
     args = parser.parse_args()
 
-    # Set random seed for reproducible results
-    random.seed(42)
-
-    generate_dataset(args.scale, mode=args.mode)
+    generate_dataset(args.scale, mode=args.mode, output_file=args.output)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 import subprocess
 import time
+import os
 import sys
 import json
-import re
+import signal
 import argparse
+import itertools
 
 def get_pod_name(label_selector):
     try:
@@ -26,6 +28,87 @@ def get_container_id(pod_name):
     except subprocess.CalledProcessError:
         return None
 
+CSV_HEADER = "Timestamp,CPU,Memory,MemLimit\n"
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+def ticks(interval):
+    # Yield once per interval on a fixed monotonic schedule, so the time spent taking a
+    # sample comes out of the wait instead of stretching the period. A sample that runs
+    # past the next deadline restarts the schedule rather than firing a catch-up burst
+    deadline = time.monotonic()
+    while True:
+        yield
+        deadline += interval
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            deadline -= delay
+
+def find_cgroup_dir(container_id):
+    # cgroup v2 directory of a container on this host. The usual docker and kubelet
+    # layouts are tried directly; anything else (e.g. kind nodes nesting kubelet cgroups
+    # inside a container's) is found by walking the hierarchy for the container ID
+    candidates = [
+        f"{CGROUP_ROOT}/system.slice/docker-{container_id}.scope",
+        f"{CGROUP_ROOT}/docker/{container_id}",
+    ]
+    for path in candidates:
+        if os.path.exists(os.path.join(path, "memory.current")):
+            return path
+    if not os.path.exists(os.path.join(CGROUP_ROOT, "cgroup.controllers")):
+        return None
+    for dirpath, dirnames, _ in os.walk(CGROUP_ROOT):
+        for name in dirnames:
+            if container_id in name and os.path.exists(os.path.join(dirpath, name, "memory.current")):
+                return os.path.join(dirpath, name)
+    return None
+
+# Large enough for a whole memory.stat, so one read always returns the complete file
+CGROUP_READ_BYTES = 16384
+
+def read_cgroup_file(fd):
+    # A single pread from offset 0 re-reads a cgroup file: no seek and no extra read to
+    # find end of file, just one syscall per file per sample
+    return os.pread(fd, CGROUP_READ_BYTES, 0).decode()
+
+def stat_value(text, key):
+    # Value of "key N" in a cgroup flat-keyed file such as cpu.stat or memory.stat
+    for line in text.splitlines():
+        name, _, value = line.partition(' ')
+        if name == key:
+            return int(value)
+    return 0
+
+def poll_cgroup_metrics(cgroup_dir, interval):
+    # The cgroup files stay open for the whole run and each sample re-reads them, with
+    # CPU usage turned into percent of one core (the docker stats convention) from the
+    # usage_usec delta, and memory reported as usage minus inactive page cache, the
+    # working set docker stats and kubectl top show. The memory limit is fixed for the
+    # container's lifetime, so memory.max is read once
+    with open(os.path.join(cgroup_dir, "memory.max")) as memory_max:
+        limit = memory_max.read().strip()
+    limit = f"{int(limit) / 1048576:.2f}MiB" if limit.isdigit() else ""
+    fds = [os.open(os.path.join(cgroup_dir, name), os.O_RDONLY)
+           for name in ("cpu.stat", "memory.current", "memory.stat")]
+    cpu_stat, memory_current, memory_stat = fds
+    try:
+        prev_usage = prev_time = None
+        for _ in ticks(interval):
+            usage = stat_value(read_cgroup_file(cpu_stat), "usage_usec")
+            now = time.monotonic()
+            # The first tick only records the CPU baseline
+            if prev_time is not None:
+                memory = int(read_cgroup_file(memory_current)) - \
+                    stat_value(read_cgroup_file(memory_stat), "inactive_file")
+                cpu_percent = (usage - prev_usage) / ((now - prev_time) * 1e6) * 100
+                yield f"{cpu_percent:.2f}%", f"{max(memory, 0) / 1048576:.2f}MiB", limit
+            prev_usage, prev_time = usage, now
+    finally:
+        for fd in fds:
+            os.close(fd)
+
 def get_kubectl_metrics(pod_name):
     try:
         cmd = ["kubectl", "top", "pod", pod_name, "--no-headers"]
@@ -38,28 +121,42 @@ def get_kubectl_metrics(pod_name):
         pass
     return None, None
 
-def get_docker_metrics(container_id):
+DOCKER_STATS_FORMAT = "{{json .}}"
+
+def parse_docker_stats(output):
+    # One JSON object per container, e.g. {"CPUPerc":"0.50%","MemUsage":"10MiB / 1GiB",...};
+    # anything around it (the stream redraws the screen before each refresh) is ignored
+    start, end = output.find('{'), output.rfind('}')
+    if start == -1 or end < start:
+        return None, None, None
     try:
-        # Format: "CPU%,MemUsage" -> "0.00%, 10MiB / 1GiB"
-        cmd = ["docker", "stats", "--no-stream", "--format", "{{.CPUPerc}},{{.MemUsage}}", container_id]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        output = result.stdout.strip()
-        if output:
-            cpu_perc, mem_usage = output.split(',')
-            # Clean CPU: "0.50%" -> "0.50" (We'll treat % as mCores * 10 later or just raw %)
-            # Actually kubectl top returns "100m" for 0.1 core (10%).
-            # Docker "100%" = 1 core. So "10%" = 0.1 core = 100m.
-            # Let's normalize to "m" (millicores) and "Mi" (Mebibytes) for consistency if possible,
-            # or just write raw and let plotter handle it.
-            # Let's write raw for now and update plotter.
-            
-            # Clean Memory: "10MiB / 1GiB" -> "10MiB"
-            mem_used = mem_usage.split('/')[0].strip()
-            
-            return cpu_perc, mem_used
-    except subprocess.CalledProcessError:
-        pass
-    return None, None
+        stats = json.loads(output[start:end + 1])
+    except ValueError:
+        return None, None, None
+    # CPU stays in docker's percent of one core ("100%" = 1 core) and memory is split
+    # into used and limit from "10MiB / 1GiB"; the plotter understands these units
+    used, _, limit = stats.get('MemUsage', '').partition('/')
+    return stats.get('CPUPerc'), used.strip(), limit.strip()
+
+def stream_docker_metrics(container_id):
+    # One long-lived docker stats process emits a line per refresh (about once a second),
+    # instead of paying a docker client start-up and a stats round trip per sample
+    cmd = ["docker", "stats", "--format", DOCKER_STATS_FORMAT, container_id]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+    try:
+        for line in proc.stdout:
+            cpu, mem, limit = parse_docker_stats(line)
+            if cpu and mem:
+                yield cpu, mem, limit
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def poll_kubectl_metrics(pod_name, interval):
+    # kubectl top does not report the memory limit
+    for _ in ticks(interval):
+        cpu, mem = get_kubectl_metrics(pod_name)
+        yield cpu, mem, ""
 
 def main():
     parser = argparse.ArgumentParser()
@@ -68,6 +165,10 @@ def main():
     parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds")
     args = parser.parse_args()
 
+    # run_tests.sh stops the monitor with SIGTERM; turn it into a normal exit so the
+    # docker stats child is terminated rather than left running
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     print(f"Monitoring pod with label {args.label}...", file=sys.stderr)
     
     # Wait for pod to appear
@@ -84,59 +185,79 @@ def main():
 
     print(f"Found pod: {pod_name}", file=sys.stderr)
 
-    # Determine monitoring method
-    method = "kubectl"
-    # Check if kubectl top works
-    cpu, mem = get_kubectl_metrics(pod_name)
-    if not cpu:
-        print("kubectl top not available, trying docker stats...", file=sys.stderr)
-        container_id = get_container_id(pod_name)
-        if container_id:
-            print(f"Found container ID: {container_id}", file=sys.stderr)
-            cpu, mem = get_docker_metrics(container_id)
-            if cpu:
-                method = "docker"
-                print("Using docker stats", file=sys.stderr)
+    # Determine monitoring method, cheapest first: the container's cgroup files when
+    # they are visible from here, then kubectl top, then docker stats
+    container_id = get_container_id(pod_name)
+    cgroup_dir = find_cgroup_dir(container_id) if container_id else None
+    if cgroup_dir:
+        method = "cgroup"
+        print(f"Using cgroup files in {cgroup_dir}", file=sys.stderr)
+    else:
+        method = "kubectl"
+        # Check if kubectl top works
+        cpu, mem = get_kubectl_metrics(pod_name)
+        if not cpu:
+            print("kubectl top not available, trying docker stats...", file=sys.stderr)
+            if container_id:
+                print(f"Found container ID: {container_id}", file=sys.stderr)
+                # The stream's first sample doubles as the probe, rather than a separate
+                # docker stats --no-stream call that waits out two collection cycles
+                samples = stream_docker_metrics(container_id)
+                first_sample = next(samples, None)
+                if first_sample:
+                    method = "docker"
+                    print("Using docker stats", file=sys.stderr)
+                else:
+                    print("docker stats failed", file=sys.stderr)
+                    method = "none"
             else:
-                print("docker stats failed", file=sys.stderr)
+                print("Could not find container ID", file=sys.stderr)
                 method = "none"
         else:
-            print("Could not find container ID", file=sys.stderr)
-            method = "none"
-    else:
-        print("Using kubectl top", file=sys.stderr)
+            print("Using kubectl top", file=sys.stderr)
 
     if method == "none":
         print("No monitoring method available", file=sys.stderr)
         # Create empty file with header
         with open(args.output, 'w') as f:
-            f.write("Timestamp,CPU,Memory\n")
+            f.write(CSV_HEADER)
         sys.exit(0)
 
-    # Monitoring loop
-    with open(args.output, 'w') as f:
-        f.write("Timestamp,CPU,Memory\n")
+    pending = []
+    if method == "cgroup":
+        samples = poll_cgroup_metrics(cgroup_dir, args.interval)
+    elif method == "kubectl":
+        samples = poll_kubectl_metrics(pod_name, args.interval)
+    else:
+        # Docker refreshes at its own cadence, so --interval does not apply here.
+        # The container ID is assumed stable for the length of a benchmark
+        pending = [first_sample]
+
+    # Monitoring loop. Rows are left to the file's buffer rather than flushed one by
+    # one; SIGTERM, Ctrl-C and errors all leave through the finally below, which writes
+    # them out and syncs them to disk (only SIGKILL can lose the buffered tail)
+    with open(args.output, 'w', buffering=8192) as f:
+        f.write(CSV_HEADER)
         
+        # Timestamps are wall-clock anchored once and advanced by the monotonic clock, so
+        # an NTP step during the run cannot reorder rows or distort the gaps between them
+        t0_wall = time.time()
+        t0_mono = time.monotonic()
+
         try:
-            while True:
-                timestamp = time.time()
-                cpu, mem = None, None
-                
-                if method == "kubectl":
-                    cpu, mem = get_kubectl_metrics(pod_name)
-                elif method == "docker":
-                    # Re-fetch container ID if needed? No, usually stable.
-                    # But if pod restarts, we might need to refresh.
-                    # For benchmark, assume stable.
-                    cpu, mem = get_docker_metrics(container_id)
-                
+            last_limit = None
+            for cpu, mem, limit in itertools.chain(pending, samples):
+                timestamp = t0_wall + (time.monotonic() - t0_mono)
                 if cpu and mem:
-                    f.write(f"{timestamp},{cpu},{mem}\n")
-                    f.flush()
-                
-                time.sleep(args.interval)
+                    # The limit almost never changes, so it is only written when it does
+                    f.write(f"{timestamp},{cpu},{mem},{limit if limit != last_limit else ''}\n")
+                    last_limit = limit
         except KeyboardInterrupt:
             pass
+        finally:
+            samples.close()
+            f.flush()
+            os.fsync(f.fileno())
 
 if __name__ == "__main__":
     main()
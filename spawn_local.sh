@@ -14,17 +14,24 @@ NC='\033[0m' # No Color
 
 # Default values
 CONFIG_FILE="config/benchmark_config.json"
-SCALE=$(python3 scripts/config_reader.py "$CONFIG_FILE" "benchmark.scale" "small")
+
+# Load scale and resource defaults from config in a single Python invocation
+CONFIG_VALUES=$(python3 scripts/config_reader.py --batch "$CONFIG_FILE" \
+    "benchmark.scale=small" \
+    "resources.postgres.cpu_request" \
+    "resources.postgres.memory_request" \
+    "resources.elasticsearch.jvm_opts")
+{
+    read -r SCALE
+    read -r CPU
+    read -r MEMORY
+    read -r JVM_OPTS
+} <<< "$CONFIG_VALUES"
 
 # Define scale-prefixed directories
 DATA_DIR="data"
 RESULTS_DIR="results"
 
-# Load resource defaults from config
-CPU=$(python3 scripts/config_reader.py "$CONFIG_FILE" "resources.postgres.cpu_request")
-MEMORY=$(python3 scripts/config_reader.py "$CONFIG_FILE" "resources.postgres.memory_request")
-JVM_OPTS=$(python3 scripts/config_reader.py "$CONFIG_FILE" "resources.elasticsearch.jvm_opts")
-
 # Function to print colored output
 print_info() {
     echo -e "${BLUE}[INFO]${NC} $1"